@@ -128,4 +128,51 @@ LOGIN_REDIRECT_URL = 'core:dashboard'
 LOGOUT_REDIRECT_URL = 'core:login'
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Deduplicated upload contents, hard linked to their names in MEDIA_ROOT. Keep
+# it outside MEDIA_ROOT (so blobs are never served) but on the same file
+# system. Deployments that kept blobs in MEDIA_ROOT/.blobs can move that
+# directory here as is.
+BLOB_ROOT = BASE_DIR / 'blobs'
+
+# Uploads are deduplicated by content. Set 'compress' to True to also gzip
+# compressible types; those must then be served through the storage API.
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+        'OPTIONS': {
+            'compress': False,
+        },
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Resumable uploads are assembled here, outside MEDIA_ROOT so partial files
+# are never served. Keep it on the same file system as BLOB_ROOT so finished
+# files are linked into storage instead of copied.
+CHUNKED_UPLOAD_DIR = BASE_DIR / 'uploads'
+CHUNKED_UPLOAD_MAX_SIZE = 4 * 1024 ** 3
+CHUNKED_UPLOAD_CHUNK_SIZE = 4 * 1024 ** 2
+
+# Protected downloads can hand the transfer to the front-end server:
+# None (Django streams the file), 'x-sendfile' (Apache, lighttpd) or
+# 'x-accel-redirect' (nginx, with an internal location at SENDFILE_URL_PREFIX
+# aliased to MEDIA_ROOT).
+SENDFILE_BACKEND = None
+SENDFILE_URL_PREFIX = '/protected-media/'
+
+# Store quiz MCQ answers packed into one column per QuizAttempt instead of one
+# StudentAnswer row per question. Descriptive answers always use rows.
+PACK_MCQ_ANSWERS = True
+
+# Students whose attendance in a subject falls below this percentage are
+# listed as low attendance.
+ATTENDANCE_LOW_THRESHOLD = 75
+
+# Lecture self check-in: how long a session stays open and how often its
+# code rotates. Buffered check-ins are written by 'flush_checkins --interval'.
+CHECKIN_WINDOW_MINUTES = 15
+CHECKIN_CODE_PERIOD = 30
@@ -16,13 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path,include
-from django.conf import settings # New import
-from django.conf.urls.static import static # New import
 
+# MEDIA_ROOT is deliberately not served, not even with DEBUG: uploaded files
+# are only available through the access-checked views in core (see
+# core.downloads), and the web server must not expose MEDIA_URL either.
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('core.urls')),
-]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]
\ No newline at end of file
@@ -1,12 +1,14 @@
 # core/admin.py
 
 from django.contrib import admin
+from django.http import StreamingHttpResponse
 from .models import (
     University, UniversityAdmin, Department, Faculty, Student,
     Course, Enrollment, Subject, LearningResource,
     Assignment, AssignmentSubmission, Quiz, Question, MCQOption,
     StudentGrade, Attendance
 )
+from .transcript_pdfs import transcript_zip
 
 # We can customize the admin interface for a better user experience.
 
@@ -41,6 +43,15 @@ class CourseAdminView(admin.ModelAdmin):
     list_display = ('title', 'code', 'department')
     list_filter = ('department__university', 'department')
     search_fields = ('title', 'code')
+    actions = ['download_transcripts']
+
+    @admin.action(description="Download transcript PDFs for the selected courses")
+    def download_transcripts(self, request, queryset):
+        # Rendered in-process: a web worker should not fork a process pool.
+        # Use the generate_transcripts command for large cohorts.
+        response = StreamingHttpResponse(transcript_zip(queryset, workers=0), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="transcripts.zip"'
+        return response
 
 @admin.register(Subject)
 class SubjectAdminView(admin.ModelAdmin):
@@ -0,0 +1,90 @@
+# core/alerts.py
+
+"""
+At-risk student alerts: low attendance and missing past-due assignments.
+
+Each check is one set-based query over the whole scope; the results are
+grouped in memory into one digest notification per student and one per
+subject for its faculty, written with a single bulk_create().
+"""
+
+from collections import defaultdict
+
+from django.db import models
+
+from .attendance import percentage, to_int
+from .models import AssignmentSubmission, AttendanceBitmap, Enrollment, Notification, Subject
+
+
+def find_low_attendance(universities, threshold, min_lectures=3):
+    """Yield (student_user_id, subject_id, percent) for attendance below ``threshold``."""
+    bitmaps = AttendanceBitmap.objects.filter(
+        subject__course__department__university__in=universities
+    ).values_list('student__user_id', 'subject_id', 'recorded', 'present')
+    for user_id, subject_id, recorded, present in bitmaps.iterator(chunk_size=5000):
+        recorded_count = to_int(recorded).bit_count()
+        if recorded_count < min_lectures:
+            continue
+        percent = percentage(to_int(present).bit_count(), recorded_count)
+        if percent < threshold:
+            yield user_id, subject_id, percent
+
+
+def find_missing_work(universities, since, until):
+    """
+    Yield (student_user_id, subject_id, assignment_title) for every enrolled
+    student with no submission for an assignment due between ``since`` and ``until``.
+    """
+    # Annotating the assignment columns in one call keeps them on a single join,
+    # so every row is one (enrollment, assignment) pair.
+    missing = Enrollment.objects.filter(course__department__university__in=universities).annotate(
+        assignment_id=models.F('course__subjects__assignments__id'),
+        subject_id=models.F('course__subjects__assignments__subject_id'),
+        title=models.F('course__subjects__assignments__title'),
+        due_date=models.F('course__subjects__assignments__due_date'),
+    ).filter(due_date__gte=since, due_date__lt=until).exclude(models.Exists(
+        AssignmentSubmission.objects.filter(
+            student_id=models.OuterRef('student_id'), assignment_id=models.OuterRef('assignment_id'),
+        )
+    )).values_list('student__user_id', 'subject_id', 'title')
+    return missing.iterator(chunk_size=5000)
+
+
+def build_alerts(low_attendance, missing_work, threshold):
+    """Turn check results into unsaved digest notifications for students and faculty."""
+    by_student = defaultdict(list)
+    by_subject = defaultdict(lambda: {'attendance': 0, 'missing': defaultdict(int)})
+    subject_ids = set()
+    for user_id, subject_id, percent in low_attendance:
+        by_student[user_id].append(('attendance', subject_id, percent))
+        by_subject[subject_id]['attendance'] += 1
+        subject_ids.add(subject_id)
+    for user_id, subject_id, title in missing_work:
+        by_student[user_id].append(('missing', subject_id, title))
+        by_subject[subject_id]['missing'][title] += 1
+        subject_ids.add(subject_id)
+
+    subjects = Subject.objects.in_bulk(subject_ids)
+    notifications = []
+    for user_id, issues in by_student.items():
+        lines = []
+        for kind, subject_id, detail in issues:
+            if kind == 'attendance':
+                lines.append(f"your attendance in {subjects[subject_id].title} is {detail:.0f}% (minimum {threshold}%)")
+            else:
+                lines.append(f"you have not submitted '{detail}' for {subjects[subject_id].title}")
+        notifications.append(Notification(recipient_id=user_id, message="Heads up: " + "; ".join(lines) + "."))
+
+    faculty_users = defaultdict(set)
+    for subject_id, user_id in Subject.faculty.through.objects.filter(
+        subject_id__in=subject_ids
+    ).values_list('subject_id', 'faculty__user_id'):
+        faculty_users[subject_id].add(user_id)
+    for subject_id, summary in by_subject.items():
+        parts = []
+        if summary['attendance']:
+            parts.append(f"{summary['attendance']} student(s) below {threshold}% attendance")
+        parts.extend(f"{count} missing submission(s) for '{title}'" for title, count in summary['missing'].items())
+        message = f"At-risk students in {subjects[subject_id].title}: " + "; ".join(parts) + "."
+        notifications.extend(Notification(recipient_id=user_id, message=message) for user_id in faculty_users[subject_id])
+    return notifications
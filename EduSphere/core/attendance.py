@@ -0,0 +1,170 @@
+# core/attendance.py
+
+"""
+Attendance storage and rollups.
+
+Attendance rows remain the record of truth; alongside them every student
+has one AttendanceBitmap per subject with a bit per lecture. Percentages
+are popcounts over two small integers, so reports read one row per
+student instead of one per student per lecture.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+
+from .models import Attendance, AttendanceBitmap, AttendanceSession, Subject
+
+ATTENDANCE_SUMMARY_TIMEOUT = 60 * 60
+
+
+def to_int(data):
+    return int.from_bytes(bytes(data or b''), 'little')
+
+
+def to_bytes(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def bitmap_counts(bitmap):
+    """Return (present, recorded) lecture counts for a bitmap."""
+    return to_int(bitmap.present).bit_count(), to_int(bitmap.recorded).bit_count()
+
+
+def percentage(present, recorded):
+    return 100 * present / recorded if recorded else None
+
+
+def session_indexes(subject, dates):
+    """Return {date: bit index} for ``dates``, creating sessions for new dates."""
+    dates = set(dates)
+    indexes = dict(
+        AttendanceSession.objects.filter(subject=subject, date__in=dates).values_list('date', 'index')
+    )
+    if dates - indexes.keys():
+        with transaction.atomic():
+            # Lock the subject so concurrent callers cannot both claim the next index.
+            Subject.objects.select_for_update().only('pk').get(pk=subject.pk)
+            # Re-read: sessions may have been created while waiting for the lock.
+            indexes = dict(
+                AttendanceSession.objects.filter(subject=subject, date__in=dates).values_list('date', 'index')
+            )
+            next_index = subject.attendance_sessions.aggregate(last=models.Max('index'))['last']
+            next_index = 0 if next_index is None else next_index + 1
+            new_sessions = [
+                AttendanceSession(subject=subject, date=date, index=next_index + offset)
+                for offset, date in enumerate(sorted(dates - indexes.keys()))
+            ]
+            AttendanceSession.objects.bulk_create(new_sessions)
+        indexes.update((session.date, session.index) for session in new_sessions)
+    return indexes
+
+
+def update_bitmaps(subject, changes):
+    """
+    Apply (student_id, date, status) changes to the subject's bitmaps in
+    one upsert, creating sessions and bitmaps as needed.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    indexes = session_indexes(subject, {date for _, date, _ in changes})
+    bitmaps = {
+        bitmap.student_id: bitmap for bitmap in AttendanceBitmap.objects.filter(
+            subject=subject, student_id__in={student_id for student_id, _, _ in changes}
+        )
+    }
+    for student_id, date, status in changes:
+        bitmap = bitmaps.get(student_id)
+        if bitmap is None:
+            bitmap = bitmaps[student_id] = AttendanceBitmap(student_id=student_id, subject=subject)
+        bit = 1 << indexes[date]
+        recorded, present = to_int(bitmap.recorded), to_int(bitmap.present)
+        recorded |= bit
+        present = present | bit if status == 'Present' else present & ~bit
+        bitmap.recorded, bitmap.present = to_bytes(recorded), to_bytes(present)
+    AttendanceBitmap.objects.bulk_create(
+        bitmaps.values(), update_conflicts=True, unique_fields=['student', 'subject'],
+        update_fields=['recorded', 'present'], batch_size=1000,
+    )
+    invalidate_attendance_summary(subject.pk)
+
+
+def clear_lecture(subject_id, student_id, date):
+    """Clear one student's bits for a lecture whose Attendance row was deleted."""
+    session = AttendanceSession.objects.filter(subject_id=subject_id, date=date).first()
+    bitmap = AttendanceBitmap.objects.filter(subject_id=subject_id, student_id=student_id).first()
+    if session is None or bitmap is None:
+        return
+    mask = ~(1 << session.index)
+    AttendanceBitmap.objects.filter(pk=bitmap.pk).update(
+        recorded=to_bytes(to_int(bitmap.recorded) & mask), present=to_bytes(to_int(bitmap.present) & mask),
+    )
+    invalidate_attendance_summary(subject_id)
+
+
+def record_session(subject, date, statuses):
+    """Save a lecture's {student_id: status} with one row upsert and one bitmap upsert."""
+    with transaction.atomic():
+        Attendance.objects.bulk_create([
+            Attendance(student_id=student_id, subject=subject, date=date, status=status)
+            for student_id, status in statuses.items()
+        ], update_conflicts=True, unique_fields=['student', 'subject', 'date'], update_fields=['status'])
+        update_bitmaps(subject, ((student_id, date, status) for student_id, status in statuses.items()))
+
+
+def rebuild_bitmaps(subject):
+    """Recreate a subject's sessions and bitmaps from its Attendance rows."""
+    with transaction.atomic():
+        AttendanceBitmap.objects.filter(subject=subject).delete()
+        AttendanceSession.objects.filter(subject=subject).delete()
+        rows = Attendance.objects.filter(subject=subject).order_by('date').values_list('student_id', 'date', 'status')
+        update_bitmaps(subject, rows.iterator())
+
+
+def _summary_key(subject_pk):
+    return f'attendance_summary:{subject_pk}'
+
+
+def subject_attendance_summary(subject):
+    """
+    Cached attendance rollup for a subject: lecture count, per-student
+    counts and percentages, the class average and the students below
+    ATTENDANCE_LOW_THRESHOLD.
+    """
+    key = _summary_key(subject.pk)
+    summary = cache.get(key)
+    if summary is None:
+        threshold = settings.ATTENDANCE_LOW_THRESHOLD
+        students = {}
+        for bitmap in AttendanceBitmap.objects.filter(subject=subject):
+            present, recorded = bitmap_counts(bitmap)
+            students[bitmap.student_id] = {
+                'present': present, 'recorded': recorded, 'percent': percentage(present, recorded),
+            }
+        percents = [row['percent'] for row in students.values() if row['percent'] is not None]
+        summary = {
+            'sessions': subject.attendance_sessions.count(),
+            'students': students,
+            'average': sum(percents) / len(percents) if percents else None,
+            'threshold': threshold,
+            'low': sorted(
+                (student_id for student_id, row in students.items() if row['percent'] is not None and row['percent'] < threshold),
+                key=lambda student_id: students[student_id]['percent'],
+            ),
+        }
+        cache.set(key, summary, ATTENDANCE_SUMMARY_TIMEOUT)
+    return summary
+
+
+def invalidate_attendance_summary(subject_pk):
+    cache.delete(_summary_key(subject_pk))
+
+
+def student_attendance(student):
+    """Return [(subject, present, recorded, percent)] for every subject the student has attendance in."""
+    rows = []
+    for bitmap in student.attendance_bitmaps.select_related('subject__course').order_by('subject__course__title', 'subject__title'):
+        present, recorded = bitmap_counts(bitmap)
+        rows.append((bitmap.subject, present, recorded, percentage(present, recorded)))
+    return rows
@@ -0,0 +1,43 @@
+# core/batching.py
+
+"""
+Deferred, deduplicated work for per-row signal receivers.
+
+Receivers that fire once per row (a grade saved, an attempt deleted in a
+cascade...) add keys to a CommitBatch, and the batch hands every key added
+on this thread to its handler in one call once the transaction commits.
+"""
+
+import threading
+
+from django.db import transaction
+
+
+class CommitBatch:
+    """
+    Collects keys and passes them to ``handler`` as one set after commit (at
+    once outside a transaction).
+
+    Every add() registers its own on_commit callback, so keys added after a
+    rolled-back savepoint are never tied to a callback Django has dropped.
+    The first callback to run handles everything collected so far; the others
+    find nothing left. Keys from a transaction that was rolled back entirely
+    are handled with the next commit instead, which only suits idempotent
+    handlers such as recomputations.
+    """
+    def __init__(self, handler):
+        self.handler = handler
+        self._local = threading.local()
+
+    def add(self, keys):
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            pending = self._local.pending = set()
+        pending.update(keys)
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        pending = getattr(self._local, 'pending', None)
+        self._local.pending = None
+        if pending:
+            self.handler(pending)
@@ -0,0 +1,204 @@
+# core/checkin.py
+
+"""
+Self check-in for lectures with a rotating code.
+
+Opening a check-in caches the session (secret, date, expiry) and the
+course roster. A check-in is validated entirely against the cache and
+recorded with a single cache.add(), so a student's request never touches
+the database. Buffered check-ins are written in batches by flush_checkin():
+by the 'flush_checkins' command (run it with --interval while check-ins are
+open) and when the session is closed.
+
+Open sessions are indexed in numbered cache slots ('checkin:open:<n>', with
+<n> taken from cache.incr()), so opening one never rewrites a shared value
+and flush_all() only looks at subjects that have a session.
+
+All web processes must share the cache (e.g. Redis or Memcached) for this
+to work in a multi-process deployment; the default LocMemCache is per process.
+"""
+
+import hashlib
+import hmac
+import secrets
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .attendance import record_session
+from .models import Attendance, Enrollment, Subject
+
+# Cached state outlives the window so an unclosed session can still be flushed.
+STATE_GRACE = 60 * 60
+
+
+class CheckInError(Exception):
+    pass
+
+
+def _key(subject_pk, *parts):
+    return ':'.join(['checkin', str(subject_pk), *map(str, parts)])
+
+
+def _timeout(session):
+    return max(int(session['expires_at'] - time.time()), 0) + STATE_GRACE
+
+
+def _index_slot(subject_pk, timeout):
+    """Record ``subject_pk`` in a fresh slot of the open-session index."""
+    cache.add('checkin:open:last', 0, None)
+    try:
+        slot = cache.incr('checkin:open:last')
+    except ValueError:
+        # The counter was evicted between add() and incr().
+        cache.add('checkin:open:last', 0, None)
+        slot = cache.incr('checkin:open:last')
+    cache.set(f'checkin:open:{slot}', subject_pk, timeout)
+
+
+def _indexed_subjects():
+    """Subject pks in the open-session index, dropping slots before the first live one."""
+    first, last = cache.get('checkin:open:first', 1), cache.get('checkin:open:last', 0)
+    slots = cache.get_many([f'checkin:open:{slot}' for slot in range(first, last + 1)])
+    live = [slot for slot in range(first, last + 1) if f'checkin:open:{slot}' in slots]
+    # Slots expire with their session, so later reads skip the expired
+    # prefix; but only up to the last slot the previous read saw, as one
+    # allocated a moment ago may not have been written yet.
+    settled = cache.get('checkin:open:seen', 0) + 1
+    cache.set_many({
+        'checkin:open:first': min(live[0] if live else last + 1, settled),
+        'checkin:open:seen': last,
+    }, None)
+    return set(slots.values())
+
+
+def open_checkins(subject_pks=None):
+    """Pks of ``subject_pks`` (default: every indexed subject) with a check-in session in the cache."""
+    if subject_pks is None:
+        subject_pks = _indexed_subjects()
+    keys = {_key(subject_pk): subject_pk for subject_pk in subject_pks}
+    return {keys[key] for key in cache.get_many(keys)}
+
+
+def get_session(subject_pk):
+    return cache.get(_key(subject_pk))
+
+
+def open_checkin(subject, minutes=None):
+    """Start (or restart) today's check-in for ``subject`` and cache its roster."""
+    minutes = minutes or settings.CHECKIN_WINDOW_MINUTES
+    if get_session(subject.pk) is not None:
+        # Keep whatever the previous session buffered.
+        flush_checkin(subject.pk)
+    session = {
+        'subject': subject.pk,
+        'date': timezone.localdate(),
+        'secret': secrets.token_bytes(16),
+        'opened_at': time.time(),
+        'expires_at': time.time() + minutes * 60,
+        'nonce': secrets.token_hex(4),  # Separates the buffers of successive sessions.
+    }
+    roster = frozenset(Enrollment.objects.filter(course_id=subject.course_id).values_list('student_id', flat=True))
+    cache.set_many({
+        _key(subject.pk): session,
+        _key(subject.pk, session['nonce'], 'roster'): roster,
+    }, _timeout(session))
+    _index_slot(subject.pk, _timeout(session))
+    return session
+
+
+def current_code(session, at=None):
+    """The 6-digit code for the period containing ``at`` (default: now)."""
+    period = int((at or time.time()) // settings.CHECKIN_CODE_PERIOD)
+    digest = hmac.new(session['secret'], str(period).encode(), hashlib.sha256).digest()
+    return f"{int.from_bytes(digest[:4], 'big') % 1_000_000:06d}"
+
+
+def seconds_until_rotation():
+    period = settings.CHECKIN_CODE_PERIOD
+    return int(period - time.time() % period)
+
+
+def check_in(subject_pk, student_id, code):
+    """
+    Buffer a student's check-in. Raises CheckInError if the session is closed,
+    the student is not on the roster or the code is wrong. Returns False if the
+    student had already checked in.
+    """
+    session = get_session(subject_pk)
+    if session is None or time.time() > session['expires_at']:
+        raise CheckInError("Check-in for this lecture is not open.")
+    roster = cache.get(_key(subject_pk, session['nonce'], 'roster'))
+    if roster is None or student_id not in roster:
+        raise CheckInError("You are not enrolled in this subject.")
+    # The previous code stays valid so a code read just before it rotates still works.
+    now = time.time()
+    valid = {current_code(session, now), current_code(session, now - settings.CHECKIN_CODE_PERIOD)}
+    if not any(hmac.compare_digest(code.strip(), candidate) for candidate in valid):
+        raise CheckInError("That code is not valid. Check the code currently shown in the lecture.")
+
+    return cache.add(_key(subject_pk, session['nonce'], 'in', student_id), now, _timeout(session))
+
+
+def checked_in(session):
+    """Student pks buffered for ``session``."""
+    roster = cache.get(_key(session['subject'], session['nonce'], 'roster')) or ()
+    keys = {_key(session['subject'], session['nonce'], 'in', student_id): student_id for student_id in roster}
+    return {keys[key] for key in cache.get_many(keys)}
+
+
+def flush_checkin(subject_pk, final=False):
+    """
+    Write buffered check-ins that have not been written yet as one batch. With
+    ``final``, also mark roster students without any record for the date as
+    absent and close the session. Returns the number of students written.
+    """
+    session = get_session(subject_pk)
+    if session is None:
+        return 0
+    flushed_key = _key(subject_pk, session['nonce'], 'flushed')
+    present = checked_in(session)
+    pending = present - (cache.get(flushed_key) or set())
+    subject = Subject.objects.filter(pk=subject_pk).first()
+    if subject is None:
+        close_checkin(subject_pk)
+        return 0
+
+    statuses = {student_id: 'Present' for student_id in pending}
+    if final:
+        roster = cache.get(_key(subject_pk, session['nonce'], 'roster')) or frozenset()
+        recorded = set(
+            Attendance.objects.filter(subject_id=subject_pk, date=session['date']).values_list('student_id', flat=True)
+        )
+        statuses.update((student_id, 'Absent') for student_id in roster - present - recorded)
+    if statuses:
+        record_session(subject, session['date'], statuses)
+    if final:
+        close_checkin(subject_pk)
+    else:
+        cache.set(flushed_key, present, _timeout(session))
+    return len(statuses)
+
+
+def close_checkin(subject_pk):
+    session = get_session(subject_pk)
+    if session is not None:
+        cache.delete_many([
+            _key(subject_pk),
+            _key(subject_pk, session['nonce'], 'roster'),
+            _key(subject_pk, session['nonce'], 'flushed'),
+        ])
+
+
+def flush_all():
+    """Flush every open session, finalising those whose window has ended. Returns rows written."""
+    written = 0
+    for subject_pk in open_checkins():
+        session = get_session(subject_pk)
+        if session is None:
+            # Closed in the meantime.
+            continue
+        written += flush_checkin(subject_pk, final=time.time() > session['expires_at'])
+    return written
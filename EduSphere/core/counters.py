@@ -0,0 +1,76 @@
+# core/counters.py
+
+"""
+Counter fields: Assignment.submission_count and Quiz.attempt_count.
+
+Single-row saves and deletes adjust the counters through signals with an
+atomic F() update. Rows deleted in a cascade (with their student, subject,
+...) are recounted once per transaction by schedule_refresh() instead.
+Ordinary saves of an assignment or quiz leave the counter column alone (see
+CounterFieldsMixin), so editing one cannot write back a stale count.
+
+Code that creates or deletes submissions or attempts in bulk (bulk_create,
+raw SQL) bypasses the signals and must call refresh_counts() for the
+affected assignments/quizzes afterwards. The 'repair_counters' command
+checks and fixes every counter.
+"""
+
+from collections import defaultdict
+
+from django.db import models
+from django.db.models.functions import Coalesce, Greatest
+
+from .batching import CommitBatch
+from .models import Assignment, AssignmentSubmission, Quiz, QuizAttempt
+
+# (model, counter field, counted model, its foreign key to the model)
+COUNTERS = [
+    (Assignment, 'submission_count', AssignmentSubmission, 'assignment'),
+    (Quiz, 'attempt_count', QuizAttempt, 'quiz'),
+]
+
+
+def adjust_count(model, field, pk, delta):
+    # Clamped so a counter that was already off can never violate the unsigned check.
+    model.objects.filter(pk=pk).update(**{field: Greatest(models.F(field) + delta, 0)})
+
+
+def _actual_count(counted, fk):
+    return Coalesce(models.Subquery(
+        counted.objects.filter(**{fk: models.OuterRef('pk')}).order_by()
+        .values(fk).annotate(count=models.Count('pk')).values('count')
+    ), 0)
+
+
+def refresh_counts(model, pks=None):
+    """Recount ``model``'s counter from scratch, for ``pks`` or every row, in one UPDATE."""
+    for counter_model, field, counted, fk in COUNTERS:
+        if counter_model is model:
+            rows = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+            return rows.update(**{field: _actual_count(counted, fk)})
+    raise ValueError(f"{model.__name__} has no counter.")
+
+
+def _refresh_pending(keys):
+    pks = defaultdict(set)
+    for model, pk in keys:
+        pks[model].add(pk)
+    for model, model_pks in pks.items():
+        refresh_counts(model, model_pks)
+
+
+# Cascade deletes add (model, pk) pairs; each transaction recounts them once.
+_pending_counts = CommitBatch(_refresh_pending)
+
+
+def schedule_refresh(model, pks):
+    """Recount ``model``'s counter for ``pks`` once the current transaction commits (right away outside one)."""
+    _pending_counts.add((model, pk) for pk in pks)
+
+
+def stale_counts():
+    """Yield (model, pk, stored, actual) for every counter that does not match its rows."""
+    for model, field, counted, fk in COUNTERS:
+        rows = model.objects.annotate(actual=_actual_count(counted, fk)).exclude(**{field: models.F('actual')})
+        for pk, stored, actual in rows.values_list('pk', field, 'actual').iterator():
+            yield model, pk, stored, actual
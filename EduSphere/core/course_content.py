@@ -0,0 +1,41 @@
+# core/course_content.py
+
+"""
+Subject content (resources, assignments and quizzes) shown on the student
+course page, where each subject's panel is loaded on demand.
+
+Rendered panels are cached as template fragments keyed on the course's
+content version, a token that signals replace whenever a subject or any of
+its content changes. Old fragments are never invalidated explicitly; they
+simply stop being looked up and expire.
+"""
+
+import time
+
+from django.core.cache import cache
+
+from .models import QuizAttempt
+
+COURSE_FRAGMENT_TIMEOUT = 60 * 60
+
+
+def _version_key(course_pk):
+    return f'course_version:{course_pk}'
+
+
+def course_version(course_pk):
+    """The course's current content version."""
+    # A fresh token (not a counter) so a version evicted from the cache can
+    # never be reissued and match fragments rendered before the eviction.
+    return cache.get_or_set(_version_key(course_pk), time.time_ns, None)
+
+
+def bump_course_version(course_pk):
+    cache.set(_version_key(course_pk), time.time_ns(), None)
+
+
+def attempted_quiz_pks(student, subject):
+    """Pks of the subject's quizzes the student has attempted, in one query."""
+    return set(
+        QuizAttempt.objects.filter(student=student, quiz__subject=subject).values_list('quiz_id', flat=True)
+    )
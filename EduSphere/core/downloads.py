@@ -0,0 +1,112 @@
+# core/downloads.py
+
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.encoding import iri_to_uri
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 64 * 1024
+
+
+def _parse_range(header, size):
+    """
+    Return (start, end) for a single 'bytes=' range, None to serve the whole
+    file, or False if the range cannot be satisfied. Multi-range requests are
+    answered with the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _iter_range(fieldfile, start, length):
+    with fieldfile.open('rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining:
+            data = f.read(min(BLOCK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def serve_file(request, fieldfile, as_attachment=False):
+    """
+    Serve a stored file after the caller has checked access.
+
+    Answers If-None-Match with 304 and single byte ranges with 206. When
+    SENDFILE_BACKEND is 'x-sendfile' or 'x-accel-redirect' the body is left to
+    the front-end server; otherwise whole files go out through FileResponse,
+    which lets the WSGI server use sendfile().
+    """
+    storage = fieldfile.storage
+    path = storage.path(fieldfile.name)
+    stat = os.stat(path)
+    compressed = getattr(storage, 'is_compressed', lambda name: False)(fieldfile.name)
+    size = storage.size(fieldfile.name) if compressed else stat.st_size
+    etag = quote_etag(f'{stat.st_ino:x}-{stat.st_mtime_ns:x}-{size:x}')
+    filename = os.path.basename(fieldfile.name)
+
+    def finish(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Accept-Ranges'] = 'bytes'
+        # Access is checked per user, so shared caches must not reuse it.
+        response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+        if 'Content-Disposition' not in response:
+            response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        return response
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+        return finish(HttpResponseNotModified())
+
+    backend = getattr(settings, 'SENDFILE_BACKEND', None)
+    if backend and not compressed:
+        response = HttpResponse(content_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        if backend == 'x-accel-redirect':
+            # nginx maps this internal location back onto MEDIA_ROOT.
+            response['X-Accel-Redirect'] = iri_to_uri(settings.SENDFILE_URL_PREFIX + fieldfile.name)
+        else:
+            response['X-Sendfile'] = path
+        return finish(response)
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = _parse_range(range_header, size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return finish(response)
+
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    if byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(_iter_range(fieldfile, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    elif compressed:
+        response = StreamingHttpResponse(_iter_range(fieldfile, 0, size), content_type=content_type)
+        response['Content-Length'] = size
+    else:
+        response = FileResponse(open(path, 'rb'), as_attachment=as_attachment, filename=filename, content_type=content_type)
+    return finish(response)
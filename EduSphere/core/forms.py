@@ -1,9 +1,48 @@
 # core/forms.py
 
 from django import forms
-from django.forms import inlineformset_factory
-from .models import AssignmentSubmission,Question,MCQOption,Quiz,Assignment , Department, Faculty,Subject
+from django.forms import inlineformset_factory, modelformset_factory
+from .models import AssignmentSubmission,Question,MCQOption,Quiz,Assignment , Department, Enrollment, Faculty,Subject,GradingScheme
+from .lookups import enrollable_students, hod_candidates, subject_faculty_candidates
 from django.contrib.auth.models import User
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.text import format_lazy
+
+
+class RemoteSelectMixin:
+    """
+    A select2 picker that searches a JSON lookup endpoint (see core.lookups)
+    as the user types. Only the selected options are rendered, so the page
+    stays small however many choices the field's queryset allows.
+    """
+    def __init__(self, url=None, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['class'] = 'select2-remote'
+        attrs['data-lookup-url'] = self.url
+        attrs.setdefault('style', 'width: 100%')
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        options = []
+        if not self.allow_multiple_selected and not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        selected = [pk for pk in value if str(pk).isdigit()]
+        field = self.choices.field
+        for obj in self.choices.queryset.filter(pk__in=selected).select_related('user') if selected else ():
+            options.append(self.create_option(name, field.prepare_value(obj), field.label_from_instance(obj), True, len(options)))
+        return [(None, options, 0)]
+
+class RemoteSelect(RemoteSelectMixin, forms.Select):
+    pass
+
+class RemoteSelectMultiple(RemoteSelectMixin, forms.SelectMultiple):
+    pass
+
 class StudentRegistrationForm(forms.ModelForm):
     student_id = forms.CharField(max_length=20, help_text="The unique ID for the student.")
     
@@ -70,27 +109,15 @@ class DepartmentForm(forms.ModelForm):
     class Meta:
         model = Department
         fields = ['name', 'hod']
-        # ADDED: Widget to apply the select2 class
         widgets = {
-            'hod': forms.Select(attrs={'class': 'select2-widget', 'style': 'width: 100%'})
+            'hod': RemoteSelect(format_lazy('{}?exclude=teaching', reverse_lazy('core:faculty_lookup'))),
         }
     def __init__(self, *args, **kwargs):
         university = kwargs.pop('university', None)
         super().__init__(*args, **kwargs)
         if university:
-            # --- NEW LOGIC TO EXCLUDE TEACHING FACULTY ---
-
-            # 1. Get the primary keys of all faculty members who are teaching a subject.
-            # The 'subjects_taught' is the related_name from the ManyToManyField on the Subject model.
-            teaching_faculty_ids = Faculty.objects.filter(
-                subjects_taught__isnull=False
-            ).values_list('pk', flat=True).distinct()
-
-            # 2. Start with the base queryset of all faculty in the university.
-            queryset = Faculty.objects.filter(university=university)
-            
-            # 3. Exclude the faculty members who are actively teaching.
-            self.fields['hod'].queryset = queryset.exclude(pk__in=teaching_faculty_ids)
+            # Faculty of this university who are not actively teaching.
+            self.fields['hod'].queryset = hod_candidates(university)
 
 
 class AssignmentSubmissionForm(forms.ModelForm):
@@ -109,6 +136,16 @@ class GradingForm(forms.ModelForm):
             'grade': forms.NumberInput(attrs={'class': 'form-control form-control-sm', 'placeholder': 'Grade'}),
             'feedback': forms.Textarea(attrs={'class': 'form-control form-control-sm', 'rows': 2, 'placeholder': 'Feedback...'}),
         }
+
+    def clean_grade(self):
+        grade = self.cleaned_data.get('grade')
+        total_marks = self.instance.assignment.total_marks
+        if grade is not None and grade > total_marks:
+            raise forms.ValidationError(f"Grade cannot exceed the assignment's total of {total_marks} marks.")
+        return grade
+
+# Grades every submission of an assignment in a single POST
+GradingFormSet = modelformset_factory(AssignmentSubmission, form=GradingForm, extra=0)
     
 class QuestionForm(forms.ModelForm):
     class Meta:
@@ -152,13 +189,71 @@ class QuizForm(forms.ModelForm):
             ),
         }
     
+class AttendanceDateForm(forms.Form):
+    date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+
+    def clean_date(self):
+        date = self.cleaned_data['date']
+        if date > timezone.localdate():
+            raise forms.ValidationError("Attendance cannot be recorded for a future date.")
+        return date
+
+class GradingSchemeForm(forms.ModelForm):
+    cutoffs = forms.CharField(
+        widget=forms.Textarea(attrs={'class': 'form-control font-monospace', 'rows': 8}),
+        help_text="One grade per line: letter, minimum percentage, grade points (e.g. \"A+ 90 4.0\").",
+    )
+
+    class Meta:
+        model = GradingScheme
+        fields = ['assignment_weight', 'quiz_weight', 'cutoffs', 'curve', 'curve_target']
+        widgets = {
+            'assignment_weight': forms.NumberInput(attrs={'class': 'form-control'}),
+            'quiz_weight': forms.NumberInput(attrs={'class': 'form-control'}),
+            'curve': forms.Select(attrs={'class': 'form-control'}),
+            'curve_target': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.initial['cutoffs'] = '\n'.join(
+            f'{letter} {minimum:g} {points:g}' for letter, minimum, points in self.instance.cutoffs
+        )
+
+    def clean_cutoffs(self):
+        cutoffs = []
+        for number, line in enumerate(self.cleaned_data['cutoffs'].splitlines(), start=1):
+            if not line.strip():
+                continue
+            parts = line.split()
+            try:
+                letter, minimum, points = parts[0], float(parts[1]), float(parts[2])
+            except (IndexError, ValueError):
+                raise forms.ValidationError(f"Line {number}: expected a letter, a minimum percentage and grade points.")
+            if len(parts) > 3 or len(letter) > 2:
+                raise forms.ValidationError(f"Line {number}: letter grades can be at most 2 characters.")
+            if not 0 <= minimum <= 100 or not 0 <= points <= 9.99:
+                raise forms.ValidationError(f"Line {number}: percentage must be 0-100 and points 0-9.99.")
+            cutoffs.append([letter, minimum, points])
+        if not cutoffs:
+            raise forms.ValidationError("Enter at least one grade.")
+        if len({letter for letter, _, _ in cutoffs}) != len(cutoffs):
+            raise forms.ValidationError("Each letter grade may only appear once.")
+        return sorted(cutoffs, key=lambda cutoff: -cutoff[1])
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('assignment_weight') == 0 and cleaned_data.get('quiz_weight') == 0:
+            raise forms.ValidationError("At least one weight must be greater than zero.")
+        return cleaned_data
+
 class SubjectForm(forms.ModelForm):
     class Meta:
         model = Subject
-        fields = ['title', 'code', 'faculty']
+        fields = ['title', 'code', 'credits', 'faculty']
         widgets = {
-            # This applies the Select2 widget to the faculty multi-select field
-            'faculty': forms.SelectMultiple(attrs={'class': 'select2-widget', 'style': 'width: 100%'})
+            # Searches faculty remotely instead of listing the whole university
+            'faculty': RemoteSelectMultiple(format_lazy('{}?exclude=hods', reverse_lazy('core:faculty_lookup'))),
         }
 
     def __init__(self, *args, **kwargs):
@@ -167,17 +262,18 @@ class SubjectForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
 
         if university:
-            # Get the primary keys of all faculty who are HODs in this university
-            hod_ids = Department.objects.filter(
-                university=university, 
-                hod__isnull=False
-            ).values_list('hod__pk', flat=True)
-
-            # Set the queryset for the 'faculty' field to:
-            # - Filter by the correct university
-            # - Exclude any faculty member who is an HOD
-            self.fields['faculty'].queryset = Faculty.objects.filter(
-                university=university
-            ).exclude(
-                pk__in=hod_ids
-            )
\ No newline at end of file
+            # Faculty of the correct university, excluding any faculty member who is an HOD
+            self.fields['faculty'].queryset = subject_faculty_candidates(university)
+
+class EnrollmentForm(forms.ModelForm):
+    class Meta:
+        model = Enrollment
+        fields = ['student', 'roll_number']
+        widgets = {'student': RemoteSelect()}
+
+    def __init__(self, *args, **kwargs):
+        course = kwargs.pop('course')
+        super().__init__(*args, **kwargs)
+        # Students of the course's university who are not enrolled in it yet
+        self.fields['student'].queryset = enrollable_students(course.university, course)
+        self.fields['student'].widget.url = f"{reverse('core:student_lookup')}?course={course.pk}"
\ No newline at end of file
@@ -0,0 +1,129 @@
+# core/gpa.py
+
+"""
+Batch GPA, CGPA and ranking over StudentGrade.
+
+recompute_students() is the single entry point: it recomputes the GPAs of
+the given students from their grades, then re-ranks only the courses and
+universities those students belong to, updating ranks that changed.
+schedule_recompute() defers it to the end of the current transaction, so
+signals for many rows trigger a single recompute.
+"""
+
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models, transaction
+
+from .batching import CommitBatch
+from .models import Student, StudentCGPA, StudentGPA, StudentGrade
+
+TWO_PLACES = Decimal('0.01')
+
+
+def weighted_average(pairs):
+    """Return (credit-weighted mean points, total credits) for (points, credits) pairs."""
+    weighted = credits = 0
+    for points, subject_credits in pairs:
+        weighted += points * subject_credits
+        credits += subject_credits
+    if not credits:
+        return Decimal('0.00'), 0
+    return (Decimal(weighted) / credits).quantize(TWO_PLACES, rounding=ROUND_HALF_UP), credits
+
+
+def dense_ranks(values):
+    """Map each key of ``values`` to its dense rank (1 = highest value; ties share a rank)."""
+    ordered = sorted(set(values.values()), reverse=True)
+    rank_of = {value: rank for rank, value in enumerate(ordered, start=1)}
+    return {key: rank_of[value] for key, value in values.items()}
+
+
+def _rerank(queryset, group_field, value_field):
+    """Dense-rank rows within each group and write back only the ranks that changed."""
+    rows = list(queryset.only('pk', group_field, value_field, 'rank'))
+    groups = defaultdict(dict)
+    for row in rows:
+        groups[getattr(row, group_field)][row] = getattr(row, value_field)
+    changed = []
+    for members in groups.values():
+        for row, rank in dense_ranks(members).items():
+            if row.rank != rank:
+                row.rank = rank
+                changed.append(row)
+    queryset.model.objects.bulk_update(changed, ['rank'], batch_size=1000)
+    return len(changed)
+
+
+def recompute_students(student_ids):
+    """Recompute GPAs, CGPAs and the affected ranks for ``student_ids``."""
+    student_ids = set(student_ids)
+    if not student_ids:
+        return
+
+    per_course = defaultdict(list)
+    per_student = defaultdict(list)
+    for student_id, course_id, points, credits in StudentGrade.objects.filter(
+        student_id__in=student_ids
+    ).values_list('student_id', 'subject__course_id', 'points', 'subject__credits').iterator():
+        per_course[student_id, course_id].append((points, credits))
+        per_student[student_id].append((points, credits))
+
+    course_gpas = []
+    for (student_id, course_id), pairs in per_course.items():
+        gpa, credits = weighted_average(pairs)
+        course_gpas.append(StudentGPA(student_id=student_id, course_id=course_id, gpa=gpa, credits=credits))
+    universities = dict(Student.objects.filter(pk__in=student_ids).values_list('pk', 'university_id'))
+    cgpas = []
+    for student_id, pairs in per_student.items():
+        cgpa, credits = weighted_average(pairs)
+        cgpas.append(StudentCGPA(
+            student_id=student_id, university_id=universities[student_id], cgpa=cgpa, credits=credits,
+        ))
+
+    with transaction.atomic():
+        # Courses these students were ranked in before, plus any they are ranked in now.
+        course_ids = set(
+            StudentGPA.objects.filter(student_id__in=student_ids).values_list('course_id', flat=True)
+        ) | {course_id for _, course_id in per_course}
+        university_ids = set(universities.values())
+
+        # Drop GPAs for courses in which a student no longer has any grade.
+        StudentGPA.objects.filter(student_id__in=student_ids).exclude(models.Exists(
+            StudentGrade.objects.filter(student_id=models.OuterRef('student_id'), subject__course_id=models.OuterRef('course_id'))
+        )).delete()
+        StudentCGPA.objects.filter(student_id__in=student_ids - per_student.keys()).delete()
+
+        StudentGPA.objects.bulk_create(
+            course_gpas, update_conflicts=True, unique_fields=['student', 'course'],
+            update_fields=['gpa', 'credits', 'computed_at'], batch_size=1000,
+        )
+        StudentCGPA.objects.bulk_create(
+            cgpas, update_conflicts=True, unique_fields=['student'],
+            update_fields=['university', 'cgpa', 'credits', 'computed_at'], batch_size=1000,
+        )
+
+        _rerank(StudentGPA.objects.filter(course_id__in=course_ids), 'course_id', 'gpa')
+        _rerank(StudentCGPA.objects.filter(university_id__in=university_ids), 'university_id', 'cgpa')
+
+
+# Grade signals add student ids; each transaction recomputes them once.
+_pending_students = CommitBatch(recompute_students)
+
+
+def schedule_recompute(student_ids):
+    """Recompute ``student_ids`` once the current transaction commits (right away outside one)."""
+    _pending_students.add(student_ids)
+
+
+def recompute_all(university=None, course=None, batch_size=5000):
+    """Recompute every student with grades, optionally limited to a university or course."""
+    students = StudentGrade.objects.all()
+    if university is not None:
+        students = students.filter(student__university=university)
+    if course is not None:
+        students = students.filter(subject__course=course)
+    student_ids = sorted(set(students.values_list('student_id', flat=True)))
+    for start in range(0, len(student_ids), batch_size):
+        recompute_students(student_ids[start:start + batch_size])
+    return len(student_ids)
@@ -0,0 +1,173 @@
+# core/gradebook.py
+
+import csv
+
+from django.db import models
+
+from .models import Assignment, AssignmentSubmission, Enrollment, Quiz, QuizAttempt
+from .stats import percentile
+
+
+class Echo:
+    """Pseudo-buffer for csv.writer: write() returns the row instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def assessment_columns(subjects):
+    """The subjects' assessments in gradebook column order: assignments, then quizzes."""
+    assignments = list(
+        Assignment.objects.filter(subject__in=subjects).select_related('subject').order_by('due_date', 'pk')
+    )
+    quizzes = list(
+        Quiz.objects.filter(subject__in=subjects).select_related('subject')
+        .annotate(total_marks=models.Sum('questions__marks')).order_by('due_date', 'pk')
+    )
+    return assignments, quizzes
+
+
+def _by_student(rows):
+    """Group an iterator of (student_id, assessment_id, value) rows sorted by student_id."""
+    current, values = None, {}
+    for student_id, assessment_id, value in rows:
+        if student_id != current:
+            if current is not None:
+                yield current, values
+            current, values = student_id, {}
+        values[assessment_id] = value
+    if current is not None:
+        yield current, values
+
+
+def _merge(roster, *grouped):
+    """
+    Merge-join the roster with per-student grade groups. Every input is sorted
+    by student id, so only one student's marks are held in memory at a time.
+    """
+    iterators = [iter(group) for group in grouped]
+    heads = [next(it, None) for it in iterators]
+    for enrollment in roster:
+        student_id = enrollment.student_id
+        marks = []
+        for i, it in enumerate(iterators):
+            # Skip grades of students no longer enrolled in the course.
+            while heads[i] is not None and heads[i][0] < student_id:
+                heads[i] = next(it, None)
+            if heads[i] is not None and heads[i][0] == student_id:
+                marks.append(heads[i][1])
+                heads[i] = next(it, None)
+            else:
+                marks.append({})
+        yield enrollment, marks
+
+
+def iter_gradebook_rows(subject, assignments, quizzes):
+    """
+    Yield (enrollment, assignment_marks, quiz_marks) for every student enrolled
+    in the subject's course, in student order. Reads the roster plus one
+    query each for assignment grades and quiz scores, all streamed.
+    """
+    roster = Enrollment.objects.filter(course=subject.course).select_related('student__user').order_by('student_id')
+    grades = AssignmentSubmission.objects.filter(
+        assignment__subject=subject
+    ).order_by('student_id').values_list('student_id', 'assignment_id', 'grade')
+    scores = QuizAttempt.objects.filter(
+        quiz__subject=subject
+    ).order_by('student_id').values_list('student_id', 'quiz_id', 'score')
+
+    for enrollment, (grade_map, score_map) in _merge(
+        roster.iterator(), _by_student(grades.iterator()), _by_student(scores.iterator())
+    ):
+        yield (
+            enrollment,
+            [grade_map.get(assignment.pk) for assignment in assignments],
+            [score_map.get(quiz.pk) for quiz in quizzes],
+        )
+
+
+def stream_gradebook_csv(subject):
+    """Generate the subject's gradebook as CSV lines: one row per student, one column per assessment."""
+    assignments, quizzes = assessment_columns([subject])
+    writer = csv.writer(Echo())
+    yield writer.writerow(
+        ['Student ID', 'Username', 'Name', 'Roll Number']
+        + [f'{a.title} (/{a.total_marks})' for a in assignments]
+        + [f'{q.title} (/{q.total_marks or 0})' for q in quizzes]
+        + ['Total']
+    )
+    for enrollment, grades, scores in iter_gradebook_rows(subject, assignments, quizzes):
+        user = enrollment.student.user
+        marks = grades + scores
+        yield writer.writerow(
+            [enrollment.student.student_id, user.username, user.get_full_name(), enrollment.roll_number]
+            + ['' if mark is None else mark for mark in marks]
+            + [sum(mark for mark in marks if mark is not None)]
+        )
+
+
+def build_gradebook(course, subjects):
+    """
+    Students x assessments matrix for ``subjects`` of ``course``.
+
+    All assignment grades and quiz scores in scope are read with one query
+    each and pivoted in memory into one list of marks per enrolled student.
+    Returns the columns, one row per student with their total and percentage
+    (of the marks they have been graded on), and per-column statistics.
+    """
+    assignments, quizzes = assessment_columns(subjects)
+    columns = [
+        {'kind': 'assignment', 'assessment': a, 'subject': a.subject, 'total_marks': a.total_marks}
+        for a in assignments
+    ] + [
+        {'kind': 'quiz', 'assessment': q, 'subject': q.subject, 'total_marks': q.total_marks or 0}
+        for q in quizzes
+    ]
+    index = {('assignment', c['assessment'].pk): i for i, c in enumerate(columns) if c['kind'] == 'assignment'}
+    index.update({('quiz', c['assessment'].pk): i for i, c in enumerate(columns) if c['kind'] == 'quiz'})
+
+    matrix = {}
+    grades = AssignmentSubmission.objects.filter(
+        assignment__subject__in=subjects, grade__isnull=False
+    ).values_list('student_id', 'assignment_id', 'grade')
+    scores = QuizAttempt.objects.filter(quiz__subject__in=subjects).values_list('student_id', 'quiz_id', 'score')
+    for kind, rows in (('assignment', grades), ('quiz', scores)):
+        for student_id, assessment_id, mark in rows.iterator():
+            marks = matrix.get(student_id)
+            if marks is None:
+                marks = matrix[student_id] = [None] * len(columns)
+            marks[index[kind, assessment_id]] = mark
+
+    roster = Enrollment.objects.filter(course=course).select_related('student__user').order_by(
+        'student__user__last_name', 'student__user__first_name', 'student_id'
+    )
+    empty = [None] * len(columns)
+    rows = []
+    for enrollment in roster:
+        marks = matrix.get(enrollment.student_id, empty)
+        total = possible = 0
+        for mark, column in zip(marks, columns):
+            if mark is not None:
+                total += mark
+                possible += column['total_marks']
+        rows.append({
+            'enrollment': enrollment,
+            'marks': marks,
+            'total': total,
+            'percent': 100 * total / possible if possible else None,
+        })
+
+    enrolled = {row['enrollment'].student_id for row in rows}
+    column_stats = []
+    for i, column in enumerate(columns):
+        values = sorted(marks[i] for student_id, marks in matrix.items() if student_id in enrolled and marks[i] is not None)
+        count = len(values)
+        mean = sum(values) / count if count else None
+        column_stats.append({
+            'count': count,
+            'mean': mean,
+            'median': percentile(values, 50),
+            'min': values[0] if values else None,
+            'max': values[-1] if values else None,
+            'mean_percent': 100 * mean / column['total_marks'] if count and column['total_marks'] else None,
+        })
+    return {'columns': columns, 'rows': rows, 'column_stats': column_stats}
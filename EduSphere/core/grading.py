@@ -0,0 +1,123 @@
+# core/grading.py
+
+"""
+Final-grade pipeline: applies a subject's GradingScheme to the marks of
+every enrolled student and writes the results to StudentGrade.
+
+Marks are read as per-student sums in one aggregate query per assessment
+type, so the cost does not depend on the number of assessments.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models, transaction
+
+from .gpa import recompute_students
+from .models import AssignmentSubmission, Enrollment, GradingScheme, Question, QuizAttempt, StudentGrade
+
+TWO_PLACES = Decimal('0.01')
+
+
+def get_scheme(subject):
+    """The subject's saved scheme, or an unsaved one with the defaults."""
+    try:
+        return subject.grading_scheme
+    except GradingScheme.DoesNotExist:
+        return GradingScheme(subject=subject)
+
+
+def letter_for(percentage, cutoffs):
+    """Return (letter, points) for the highest cutoff that ``percentage`` reaches."""
+    for letter, minimum, points in sorted(cutoffs, key=lambda cutoff: -cutoff[1]):
+        if percentage >= minimum:
+            return letter, points
+    letter, _, points = min(cutoffs, key=lambda cutoff: cutoff[1])
+    return letter, points
+
+
+def apply_curve(percentages, scheme):
+    """Curve a {student_id: percentage} mapping according to the scheme, clamped to 0-100."""
+    if not percentages or scheme.curve == 'NONE':
+        return percentages
+    values = percentages.values()
+    if scheme.curve == 'TOP':
+        top = max(values)
+        factor = 100 / top if top else 1
+        curved = {student_id: p * factor for student_id, p in percentages.items()}
+    else:
+        shift = float(scheme.curve_target) - sum(values) / len(percentages)
+        curved = {student_id: p + shift for student_id, p in percentages.items()}
+    return {student_id: min(max(p, 0.0), 100.0) for student_id, p in curved.items()}
+
+
+def compute_final_grades(subject, scheme=None):
+    """
+    Compute every enrolled student's final percentage, letter and points.
+
+    Each category's percentage is the student's marks over the marks
+    available in that category; missing work counts as zero. Returns a list
+    of dicts ordered like the course roster.
+    """
+    scheme = scheme or get_scheme(subject)
+    assignment_total = subject.assignments.aggregate(total=models.Sum('total_marks'))['total'] or 0
+    quiz_total = Question.objects.filter(quiz__subject=subject).aggregate(total=models.Sum('marks'))['total'] or 0
+    weights = []
+    if assignment_total:
+        weights.append(('assignment', scheme.assignment_weight, assignment_total))
+    if quiz_total:
+        weights.append(('quiz', scheme.quiz_weight, quiz_total))
+    weight_sum = sum(weight for _, weight, _ in weights)
+
+    earned = {
+        'assignment': dict(
+            AssignmentSubmission.objects.filter(assignment__subject=subject, grade__isnull=False)
+            .values('student_id').annotate(total=models.Sum('grade')).values_list('student_id', 'total')
+        ),
+        'quiz': dict(
+            QuizAttempt.objects.filter(quiz__subject=subject)
+            .values('student_id').annotate(total=models.Sum('score')).values_list('student_id', 'total')
+        ),
+    }
+    roster = list(
+        Enrollment.objects.filter(course=subject.course).select_related('student__user')
+        .order_by('student__user__last_name', 'student__user__first_name', 'student_id')
+    )
+
+    raw = {}
+    for enrollment in roster:
+        student_id = enrollment.student_id
+        raw[student_id] = sum(
+            weight * min(earned[kind].get(student_id, 0) / available, 1.0)
+            for kind, weight, available in weights
+        ) * 100 / weight_sum if weight_sum else 0.0
+    curved = apply_curve(raw, scheme)
+
+    results = []
+    for enrollment in roster:
+        percentage = Decimal(curved[enrollment.student_id]).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+        letter, points = letter_for(percentage, scheme.cutoffs)
+        results.append({
+            'enrollment': enrollment,
+            'raw_percentage': raw[enrollment.student_id],
+            'percentage': percentage,
+            'grade': letter,
+            'points': Decimal(str(points)).quantize(TWO_PLACES),
+        })
+    return results
+
+
+def publish_final_grades(subject, scheme=None):
+    """Compute final grades, upsert them into StudentGrade and refresh the affected GPAs."""
+    results = compute_final_grades(subject, scheme)
+    with transaction.atomic():
+        StudentGrade.objects.bulk_create([
+            StudentGrade(
+                student_id=result['enrollment'].student_id, subject=subject,
+                grade=result['grade'], points=result['points'], percentage=result['percentage'],
+            )
+            for result in results
+        ], update_conflicts=True, unique_fields=['student', 'subject'],
+            update_fields=['grade', 'points', 'percentage'], batch_size=1000)
+        # bulk_create() sends no post_save, so refresh GPAs here.
+        recompute_students(result['enrollment'].student_id for result in results)
+    return results
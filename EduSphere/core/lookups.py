@@ -0,0 +1,61 @@
+# core/lookups.py
+
+"""
+Choices and search for the remote (typeahead) student and faculty pickers.
+
+The pickers never render their full option lists: forms limit their
+querysets with the functions below for validation, and select2 fetches one
+page of prefix matches at a time from the lookup views.
+"""
+
+from django.db import models
+
+from .models import Department, Enrollment, Faculty, Student, Subject
+
+LOOKUP_PAGE_SIZE = 20
+
+
+def enrollable_students(university, course=None):
+    """Students of ``university``, excluding those already enrolled in ``course``."""
+    students = Student.objects.filter(university=university)
+    if course is not None:
+        students = students.exclude(
+            models.Exists(Enrollment.objects.filter(course=course, student_id=models.OuterRef('pk')))
+        )
+    return students
+
+
+def hod_candidates(university):
+    """Faculty of ``university`` who do not teach any subject."""
+    return Faculty.objects.filter(university=university).exclude(
+        models.Exists(Subject.faculty.through.objects.filter(faculty_id=models.OuterRef('pk')))
+    )
+
+
+def subject_faculty_candidates(university):
+    """Faculty of ``university`` who are not an HOD."""
+    return Faculty.objects.filter(university=university).exclude(
+        models.Exists(Department.objects.filter(hod_id=models.OuterRef('pk')))
+    )
+
+
+def prefix_search(queryset, term, id_field):
+    """Filter students or faculty so every word of ``term`` starts their name, username or ``id_field``."""
+    for word in term.split():
+        queryset = queryset.filter(
+            models.Q(**{f'{id_field}__istartswith': word}) | models.Q(user__username__istartswith=word)
+            | models.Q(user__first_name__istartswith=word) | models.Q(user__last_name__istartswith=word)
+        )
+    return queryset
+
+
+def lookup_page(queryset, term, id_field, page=1):
+    """One page of matches in the format select2 expects."""
+    # Ordered by the ID so scoped queries walk the (university, ID) unique index.
+    queryset = prefix_search(queryset, term, id_field).select_related('user').order_by(id_field, 'pk')
+    start = (page - 1) * LOOKUP_PAGE_SIZE
+    rows = list(queryset[start:start + LOOKUP_PAGE_SIZE + 1])
+    return {
+        'results': [{'id': row.pk, 'text': str(row)} for row in rows[:LOOKUP_PAGE_SIZE]],
+        'pagination': {'more': len(rows) > LOOKUP_PAGE_SIZE},
+    }
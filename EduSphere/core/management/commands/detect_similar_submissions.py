@@ -0,0 +1,27 @@
+# core/management/commands/detect_similar_submissions.py
+
+from django.core.management.base import BaseCommand
+
+from core.models import Assignment
+from core.similarity import SIMILARITY_THRESHOLD, detect_similar_submissions
+
+
+class Command(BaseCommand):
+    help = "Fingerprint new assignment submissions and flag near-duplicate pairs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assignment', type=int, action='append', help="Only process this assignment ID (repeatable).")
+        parser.add_argument('--workers', type=int, default=None, help="Size of the text extraction process pool.")
+        parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD, help="Minimum estimated similarity to flag.")
+
+    def handle(self, *args, **options):
+        assignments = Assignment.objects.filter(submissions__fingerprint__isnull=True).distinct()
+        if options['assignment']:
+            assignments = assignments.filter(pk__in=options['assignment'])
+
+        total = 0
+        for assignment in assignments.iterator():
+            flagged = detect_similar_submissions(assignment, options['workers'], options['threshold'])
+            total += flagged
+            self.stdout.write(f"{assignment}: {flagged} new pair(s) flagged.")
+        self.stdout.write(self.style.SUCCESS(f"Done. {total} new pair(s) flagged."))
@@ -0,0 +1,24 @@
+# core/management/commands/flush_checkins.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.checkin import flush_all
+
+
+class Command(BaseCommand):
+    help = "Write buffered lecture check-ins to the database and close expired check-in sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Keep running, flushing every INTERVAL seconds. By default flush once and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            written = flush_all()
+            if written or not options['interval']:
+                self.stdout.write(f"Wrote {written} attendance record(s).")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,27 @@
+# core/management/commands/generate_transcripts.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Course
+from core.transcript_pdfs import transcript_zip
+
+
+class Command(BaseCommand):
+    help = "Write transcript PDFs for every student enrolled in the given course(s) into one ZIP file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', required=True, help="Course ID (repeatable).")
+        parser.add_argument('--output', default='transcripts.zip', help="Path of the ZIP file to write.")
+        parser.add_argument('--workers', type=int, default=None, help="Size of the PDF rendering process pool (0 renders in this process).")
+
+    def handle(self, *args, **options):
+        courses = Course.objects.filter(pk__in=options['course'])
+        if courses.count() != len(set(options['course'])):
+            raise CommandError("One or more course IDs do not exist.")
+
+        size = 0
+        with open(options['output'], 'wb') as out:
+            for chunk in transcript_zip(courses, options['workers']):
+                out.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']} ({size // 1024} KB)."))
@@ -0,0 +1,29 @@
+# core/management/commands/purge_stale_uploads.py
+
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import ChunkedUpload
+
+
+class Command(BaseCommand):
+    help = "Delete resumable uploads (and their temp files) that were abandoned before finishing, and unused blobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2, help="Age in days after which an unfinished upload is discarded.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        stale = ChunkedUpload.objects.filter(created_at__lt=cutoff)
+        count = 0
+        # Delete one by one so each upload's temp file is removed too.
+        for upload in stale.iterator():
+            upload.delete()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} stale upload(s)."))
+        if hasattr(default_storage, 'collect_orphan_blobs'):
+            removed = default_storage.collect_orphan_blobs()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {removed} unused blob(s)."))
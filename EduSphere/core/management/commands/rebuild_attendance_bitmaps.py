@@ -0,0 +1,23 @@
+# core/management/commands/rebuild_attendance_bitmaps.py
+
+from django.core.management.base import BaseCommand
+
+from core.attendance import rebuild_bitmaps
+from core.models import Subject
+
+
+class Command(BaseCommand):
+    help = "Rebuild attendance sessions and bitmaps from the Attendance rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subject', type=int, action='append', help="Only rebuild this subject ID (repeatable).")
+
+    def handle(self, *args, **options):
+        subjects = Subject.objects.filter(attendance_records__isnull=False).distinct()
+        if options['subject']:
+            subjects = Subject.objects.filter(pk__in=options['subject'])
+        count = 0
+        for subject in subjects.iterator():
+            rebuild_bitmaps(subject)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt attendance bitmaps for {count} subject(s)."))
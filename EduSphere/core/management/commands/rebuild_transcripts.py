@@ -0,0 +1,21 @@
+# core/management/commands/rebuild_transcripts.py
+
+from django.core.management.base import BaseCommand
+
+from core.models import Student
+from core.transcripts import rebuild_transcripts
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized transcript entries from submissions and quiz attempts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--student', action='append', dest='students', metavar='STUDENT_ID',
+                            help="Only rebuild this student's entries (by student ID). May be repeated.")
+
+    def handle(self, *args, **options):
+        students = None
+        if options['students']:
+            students = Student.objects.filter(student_id__in=options['students'])
+        written = rebuild_transcripts(students)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} transcript entries."))
@@ -0,0 +1,23 @@
+# core/management/commands/recompute_gpas.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.gpa import recompute_all
+from core.models import Course, University
+
+
+class Command(BaseCommand):
+    help = "Recompute GPAs, CGPAs and ranks from StudentGrade, for everyone or one university/course."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--university', type=int, help="Only students of this university (by ID).")
+        parser.add_argument('--course', type=int, help="Only students graded in this course (by ID).")
+
+    def handle(self, *args, **options):
+        try:
+            university = University.objects.get(pk=options['university']) if options['university'] else None
+            course = Course.objects.get(pk=options['course']) if options['course'] else None
+        except (University.DoesNotExist, Course.DoesNotExist) as e:
+            raise CommandError(str(e))
+        count = recompute_all(university=university, course=course)
+        self.stdout.write(self.style.SUCCESS(f"Recomputed GPAs for {count} student(s)."))
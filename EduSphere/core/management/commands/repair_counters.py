@@ -0,0 +1,27 @@
+# core/management/commands/repair_counters.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.counters import refresh_counts, stale_counts
+
+
+class Command(BaseCommand):
+    help = "Check Assignment.submission_count and Quiz.attempt_count against the actual rows and fix any that are off."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Only report stale counters; exit with status 1 if any.")
+
+    def handle(self, *args, **options):
+        stale = {}
+        for model, pk, stored, actual in stale_counts():
+            self.stdout.write(f"{model.__name__} {pk}: stored {stored}, actual {actual}")
+            stale.setdefault(model, []).append(pk)
+        count = sum(map(len, stale.values()))
+        if not count:
+            self.stdout.write(self.style.SUCCESS("All counters are correct."))
+            return
+        if options['check']:
+            raise CommandError(f"{count} counter(s) are stale.")
+        for model, pks in stale.items():
+            refresh_counts(model, pks)
+        self.stdout.write(self.style.SUCCESS(f"Repaired {count} counter(s)."))
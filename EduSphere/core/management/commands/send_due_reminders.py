@@ -0,0 +1,23 @@
+# core/management/commands/send_due_reminders.py
+
+from django.core.management.base import BaseCommand
+
+from core.reminders import send_due_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Remind students about assignments and quizzes due within --hours that they have not handed in. "
+        "Each student is reminded once per assessment, so it is safe to run as often as you like (e.g. hourly)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Look this many hours ahead (default 24).")
+        parser.add_argument('--dry-run', action='store_true', help="Count the reminders without sending them.")
+
+    def handle(self, *args, **options):
+        count = send_due_reminders(options['hours'], dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"Would send {count} reminder(s).")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Sent {count} reminder(s)."))
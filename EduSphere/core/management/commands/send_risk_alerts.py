@@ -0,0 +1,45 @@
+# core/management/commands/send_risk_alerts.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.alerts import build_alerts, find_low_attendance, find_missing_work
+from core.models import Notification, University
+
+
+class Command(BaseCommand):
+    help = (
+        "Notify students (and their subjects' faculty) about attendance below the threshold and "
+        "assignments that fell due in the last --days days without a submission. Schedule it every "
+        "--days days (e.g. weekly from cron) so each missed assignment is reported once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--university', type=int, help="Only this university (by ID).")
+        parser.add_argument('--threshold', type=float, help="Attendance %% below which to alert (default ATTENDANCE_LOW_THRESHOLD).")
+        parser.add_argument('--min-lectures', type=int, default=3, help="Ignore subjects with fewer recorded lectures (default 3).")
+        parser.add_argument('--days', type=int, default=7, help="Report assignments due in this many past days (default 7).")
+        parser.add_argument('--dry-run', action='store_true', help="Count the alerts without sending them.")
+
+    def handle(self, *args, **options):
+        universities = University.objects.all()
+        if options['university']:
+            universities = universities.filter(pk=options['university'])
+            if not universities.exists():
+                raise CommandError(f"University {options['university']} does not exist.")
+        threshold = options['threshold'] if options['threshold'] is not None else settings.ATTENDANCE_LOW_THRESHOLD
+        now = timezone.now()
+
+        notifications = build_alerts(
+            find_low_attendance(universities, threshold, options['min_lectures']),
+            find_missing_work(universities, now - timedelta(days=options['days']), now),
+            threshold,
+        )
+        if options['dry_run']:
+            self.stdout.write(f"Would send {len(notifications)} alert(s).")
+            return
+        Notification.objects.bulk_create(notifications, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f"Sent {len(notifications)} alert(s)."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_student_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='mcq_choices',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
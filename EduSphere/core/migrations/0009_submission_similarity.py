@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionFingerprint',
+            fields=[
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='core.assignmentsubmission')),
+                ('signature', models.BinaryField()),
+                ('shingle_count', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SimilarityFlag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similarity', models.FloatField()),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_flags', to='core.assignment')),
+                ('submission_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.assignmentsubmission')),
+                ('submission_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.assignmentsubmission')),
+            ],
+            options={
+                'unique_together': {('submission_a', 'submission_b')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_submission_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ASSIGNMENT', 'Assignment'), ('QUIZ', 'Quiz')], max_length=10)),
+                ('title', models.CharField(max_length=255)),
+                ('score', models.PositiveIntegerField()),
+                ('total_marks', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('assignment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transcript_entries', to='core.assignment')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.course')),
+                ('quiz', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transcript_entries', to='core.quiz')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transcript_entries', to='core.student')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transcript_entries', to='core.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'course', 'subject'], name='core_transc_student_b3e8c8_idx')],
+                'unique_together': {('student', 'assignment'), ('student', 'quiz')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_transcriptentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='credits',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='StudentCGPA',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cgpa', serialize=False, to='core.student')),
+                ('cgpa', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('credits', models.PositiveIntegerField()),
+                ('rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.university')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['university', '-cgpa'], name='core_studen_univers_566329_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentGPA',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gpa', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('credits', models.PositiveIntegerField()),
+                ('rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_gpas', to='core.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_gpas', to='core.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', '-gpa'], name='core_studen_course__d1d6ce_idx')],
+                'unique_together': {('student', 'course')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:39
+
+import core.models
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_gpa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingScheme',
+            fields=[
+                ('subject', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='grading_scheme', serialize=False, to='core.subject')),
+                ('assignment_weight', models.PositiveSmallIntegerField(default=50, validators=[django.core.validators.MaxValueValidator(100)])),
+                ('quiz_weight', models.PositiveSmallIntegerField(default=50, validators=[django.core.validators.MaxValueValidator(100)])),
+                ('cutoffs', models.JSONField(default=core.models.default_grade_cutoffs)),
+                ('curve', models.CharField(choices=[('NONE', 'No curve'), ('TOP', 'Scale so the top student gets 100%'), ('MEAN', 'Shift so the class mean equals the target')], default='NONE', max_length=4)),
+                ('curve_target', models.DecimalField(decimal_places=2, default=70, help_text="Target class mean (%) for the 'MEAN' curve.", max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='studentgrade',
+            name='percentage',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True),
+        ),
+    ]
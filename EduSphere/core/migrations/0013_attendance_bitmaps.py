@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_gradingscheme'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded', models.BinaryField(default=b'')),
+                ('present', models.BinaryField(default=b'')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='core.student')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='core.subject')),
+            ],
+            options={
+                'unique_together': {('student', 'subject')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('index', models.PositiveIntegerField()),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_sessions', to='core.subject')),
+            ],
+            options={
+                'unique_together': {('subject', 'date'), ('subject', 'index')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_attendance_bitmaps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DueReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='core.assignment')),
+                ('quiz', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='core.quiz')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='due_reminders', to='core.student')),
+            ],
+            options={
+                'unique_together': {('student', 'assignment'), ('student', 'quiz')},
+            },
+        ),
+    ]
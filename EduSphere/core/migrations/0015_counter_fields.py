@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:49
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_existing(apps, schema_editor):
+    for model_name, field, counted_name, fk in [
+        ('Assignment', 'submission_count', 'AssignmentSubmission', 'assignment'),
+        ('Quiz', 'attempt_count', 'QuizAttempt', 'quiz'),
+    ]:
+        counted = apps.get_model('core', counted_name)
+        apps.get_model('core', model_name).objects.update(**{field: Coalesce(models.Subquery(
+            counted.objects.filter(**{fk: models.OuterRef('pk')}).order_by()
+            .values(fk).annotate(count=models.Count('pk')).values('count')
+        ), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_due_reminders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='submission_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='attempt_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,10 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.forms import ValidationError
+from django.conf import settings
+import os
+import struct
+import uuid
 
 # -----------------------------------------------------------------------------
 # SECTION 1: CORE ORGANIZATIONAL & USER PROFILE MODELS
@@ -123,6 +127,8 @@ class Subject(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='subjects')
     # ManyToManyField allows for co-teaching/collaboration
     faculty = models.ManyToManyField(Faculty, related_name='subjects_taught')
+    # Weight of the subject's grade points in GPA calculations.
+    credits = models.PositiveSmallIntegerField(default=1)
 
     class Meta:
         unique_together = ('code', 'course') # Subject code unique within a course
@@ -146,13 +152,32 @@ class LearningResource(models.Model):
     def __str__(self):
         return self.title
 
-class Assignment(models.Model):
+class CounterFieldsMixin:
+    """
+    Leaves ``counter_fields`` out of saves of existing rows. core.counters
+    keeps them current with F() updates, which an instance loaded earlier (e.g.
+    by an edit form) would otherwise overwrite with its stale value.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not args and not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+class Assignment(CounterFieldsMixin, models.Model):
     """Represents an assignment for a subject."""
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='assignments')
     title = models.CharField(max_length=255)
     description = models.TextField()
     due_date = models.DateTimeField()
     total_marks = models.PositiveIntegerField()
+    # Number of submissions, maintained by core.counters.
+    submission_count = models.PositiveIntegerField(default=0, editable=False)
+    counter_fields = ('submission_count',)
 
     def __str__(self):
         return f"Assignment: {self.title} for {self.subject.title}"
@@ -172,11 +197,14 @@ class AssignmentSubmission(models.Model):
     def __str__(self):
         return f"Submission by {self.student} for {self.assignment.title}"
 
-class Quiz(models.Model):
+class Quiz(CounterFieldsMixin, models.Model):
     """Represents a quiz for a subject."""
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='quizzes')
     title = models.CharField(max_length=255)
     due_date = models.DateTimeField()
+    # Number of attempts, maintained by core.counters.
+    attempt_count = models.PositiveIntegerField(default=0, editable=False)
+    counter_fields = ('attempt_count',)
 
     def __str__(self):
         return f"Quiz: {self.title} for {self.subject.title}"
@@ -210,6 +238,10 @@ class QuizAttempt(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='quiz_attempts')
     score = models.PositiveIntegerField()
     completed_at = models.DateTimeField(auto_now_add=True)
+    # Compact MCQ storage: the chosen MCQOption ids packed as little-endian
+    # uint64s. When set, MCQ answers have no StudentAnswer rows; use
+    # get_answers() rather than the 'answers' relation to read them.
+    mcq_choices = models.BinaryField(null=True, blank=True, editable=False)
 
     class Meta:
         # A student can only attempt a quiz once
@@ -218,6 +250,44 @@ class QuizAttempt(models.Model):
     def __str__(self):
         return f"{self.student}'s attempt on {self.quiz}"
 
+    def pack_mcq_choices(self, options):
+        """Store the selected MCQ options in the packed column."""
+        option_ids = sorted(option.pk for option in options)
+        self.mcq_choices = struct.pack(f'<{len(option_ids)}Q', *option_ids)
+
+    def get_mcq_choice_ids(self):
+        if not self.mcq_choices:
+            return []
+        data = bytes(self.mcq_choices)
+        return list(struct.unpack(f'<{len(data) // 8}Q', data))
+
+    def get_answers(self):
+        """
+        Return every answer for this attempt as StudentAnswer instances ordered
+        by question, whether it is stored as a row or in the packed column.
+        Packed MCQ answers come back as unsaved instances.
+        """
+        if not hasattr(self, '_answers_cache'):
+            answers = list(self.answers.select_related('question', 'mcq_option'))
+            choice_ids = self.get_mcq_choice_ids()
+            if choice_ids:
+                # Options deleted since the attempt simply drop out, exactly as
+                # their StudentAnswer rows would have been cascaded away.
+                for option in MCQOption.objects.filter(pk__in=choice_ids).select_related('question'):
+                    answers.append(StudentAnswer(
+                        quiz_attempt=self, question=option.question, mcq_option=option,
+                    ))
+            answers.sort(key=lambda answer: answer.question_id)
+            self._answers_cache = answers
+        return self._answers_cache
+
+    def get_mcq_score(self):
+        """Marks earned on auto-graded MCQ questions."""
+        return sum(
+            answer.question.marks for answer in self.get_answers()
+            if answer.mcq_option is not None and answer.mcq_option.is_correct
+        )
+
 # core/models.py
 
 class StudentAnswer(models.Model):
@@ -231,6 +301,31 @@ class StudentAnswer(models.Model):
     def __str__(self):
         return f"Answer to Q: {self.question.text[:30]}..."
 
+class SubmissionFingerprint(models.Model):
+    """MinHash signature of a submission's extracted text, computed once per submission."""
+    submission = models.OneToOneField(AssignmentSubmission, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint')
+    signature = models.BinaryField() # Empty when no text could be extracted
+    shingle_count = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Fingerprint of {self.submission}"
+
+class SimilarityFlag(models.Model):
+    """A pair of submissions to the same assignment whose content looks near-identical."""
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='similarity_flags')
+    # submission_a always has the lower primary key, so each pair is stored once.
+    submission_a = models.ForeignKey(AssignmentSubmission, on_delete=models.CASCADE, related_name='+')
+    submission_b = models.ForeignKey(AssignmentSubmission, on_delete=models.CASCADE, related_name='+')
+    similarity = models.FloatField() # Estimated Jaccard similarity, 0-1
+    detected_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('submission_a', 'submission_b')
+
+    def __str__(self):
+        return f"{self.submission_a.student} ~ {self.submission_b.student} ({self.similarity:.0%})"
+
 # -----------------------------------------------------------------------------
 # SECTION 4: TRANSCRIPT & PROGRESS MODELS
 # -----------------------------------------------------------------------------
@@ -242,6 +337,8 @@ class StudentGrade(models.Model):
     # Storing both letter grade and points makes GPA calculation easier
     grade = models.CharField(max_length=2) # e.g., 'A+', 'B', 'C-'
     points = models.DecimalField(max_digits=3, decimal_places=2) # e.g., 4.00, 3.33
+    # Final weighted percentage, when the grade was computed from a GradingScheme.
+    percentage = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
 
     class Meta:
         unique_together = ('student', 'subject')
@@ -249,6 +346,99 @@ class StudentGrade(models.Model):
     def __str__(self):
         return f"{self.student}: {self.subject.code} - {self.grade}"
 
+class TranscriptEntry(models.Model):
+    """
+    One graded assessment on a student's transcript, denormalized so the
+    transcript page is a single query. Kept in sync by core.transcripts;
+    rebuild with the 'rebuild_transcripts' management command.
+    """
+    KIND_CHOICES = [
+        ('ASSIGNMENT', 'Assignment'),
+        ('QUIZ', 'Quiz'),
+    ]
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='transcript_entries')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='transcript_entries')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, null=True, blank=True, related_name='transcript_entries')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, null=True, blank=True, related_name='transcript_entries')
+    title = models.CharField(max_length=255)
+    score = models.PositiveIntegerField()
+    total_marks = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Exactly one of assignment/quiz is set; NULLs never conflict.
+        unique_together = [('student', 'assignment'), ('student', 'quiz')]
+        indexes = [models.Index(fields=['student', 'course', 'subject'])]
+
+    def __str__(self):
+        return f"{self.student}: {self.title} - {self.score}/{self.total_marks}"
+
+def default_grade_cutoffs():
+    return [
+        ['A+', 90, 4.0], ['A', 80, 4.0], ['B+', 75, 3.5], ['B', 70, 3.0],
+        ['C+', 65, 2.5], ['C', 60, 2.0], ['D', 50, 1.0], ['F', 0, 0.0],
+    ]
+
+class GradingScheme(models.Model):
+    """How a subject's final grade is computed from its assignments and quizzes (see core.grading)."""
+    CURVE_CHOICES = [
+        ('NONE', 'No curve'),
+        ('TOP', 'Scale so the top student gets 100%'),
+        ('MEAN', 'Shift so the class mean equals the target'),
+    ]
+    subject = models.OneToOneField(Subject, on_delete=models.CASCADE, primary_key=True, related_name='grading_scheme')
+    # Relative weights; they are normalised, and a category without assessments is ignored.
+    assignment_weight = models.PositiveSmallIntegerField(default=50, validators=[MaxValueValidator(100)])
+    quiz_weight = models.PositiveSmallIntegerField(default=50, validators=[MaxValueValidator(100)])
+    # [letter, minimum percentage, grade points], highest cutoff first.
+    cutoffs = models.JSONField(default=default_grade_cutoffs)
+    curve = models.CharField(max_length=4, choices=CURVE_CHOICES, default='NONE')
+    curve_target = models.DecimalField(
+        max_digits=5, decimal_places=2, default=70,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+        help_text="Target class mean (%) for the 'MEAN' curve.",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Grading scheme for {self.subject.code}"
+
+class StudentGPA(models.Model):
+    """
+    Credit-weighted GPA of a student within one course, and the student's
+    dense rank among the course's students. Computed by core.gpa.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='course_gpas')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='student_gpas')
+    gpa = models.DecimalField(max_digits=4, decimal_places=2)
+    credits = models.PositiveIntegerField()
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'course')
+        indexes = [models.Index(fields=['course', '-gpa'])]
+
+    def __str__(self):
+        return f"{self.student}: {self.course.code} GPA {self.gpa}"
+
+class StudentCGPA(models.Model):
+    """Credit-weighted GPA across all of a student's courses, ranked within the university."""
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='cgpa')
+    university = models.ForeignKey(University, on_delete=models.CASCADE, related_name='+')
+    cgpa = models.DecimalField(max_digits=4, decimal_places=2)
+    credits = models.PositiveIntegerField()
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['university', '-cgpa'])]
+
+    def __str__(self):
+        return f"{self.student}: CGPA {self.cgpa}"
+
 class Attendance(models.Model):
     """Tracks student attendance for a subject on a given date."""
     STATUS_CHOICES = [
@@ -266,6 +456,36 @@ class Attendance(models.Model):
     def __str__(self):
         return f"{self.student} - {self.subject.code} on {self.date}: {self.status}"
     
+class AttendanceSession(models.Model):
+    """A lecture of a subject on a date; ``index`` is its bit position in AttendanceBitmap."""
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='attendance_sessions')
+    date = models.DateField()
+    index = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = [('subject', 'date'), ('subject', 'index')]
+
+    def __str__(self):
+        return f"{self.subject.code} on {self.date}"
+
+class AttendanceBitmap(models.Model):
+    """
+    Compact attendance of one student in one subject: bit N of ``recorded``
+    is set if the student has a record for session N, and bit N of
+    ``present`` if they attended it (little-endian bytes). Derived from the
+    Attendance rows by core.attendance.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_bitmaps')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='attendance_bitmaps')
+    recorded = models.BinaryField(default=b'')
+    present = models.BinaryField(default=b'')
+
+    class Meta:
+        unique_together = ('student', 'subject')
+
+    def __str__(self):
+        return f"Attendance bitmap: {self.student} in {self.subject.code}"
+
 class Notification(models.Model):
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     message = models.TextField()
@@ -276,4 +496,55 @@ class Notification(models.Model):
         return f"Notification for {self.recipient.username}"
 
     class Meta:
-        ordering = ['-timestamp']
\ No newline at end of file
+        ordering = ['-timestamp']
+
+class DueReminder(models.Model):
+    """
+    Records that a student was reminded about an upcoming assessment, so the
+    'send_due_reminders' command never reminds them twice.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='due_reminders')
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, null=True, blank=True, related_name='reminders')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, null=True, blank=True, related_name='reminders')
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # At most one reminder per student and assessment. Each row sets only
+        # one of assignment/quiz and the other constraint sees a NULL, which
+        # never collides.
+        unique_together = [('student', 'assignment'), ('student', 'quiz')]
+
+    def __str__(self):
+        return f"Reminder for {self.student} about {self.assignment or self.quiz}"
+
+# -----------------------------------------------------------------------------
+# SECTION 5: FILE UPLOADS
+# -----------------------------------------------------------------------------
+
+class ChunkedUpload(models.Model):
+    """A resumable upload in progress. The bytes received so far live in a temp file on disk."""
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chunked_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True) # Optional whole-file checksum from the client
+    offset = models.PositiveBigIntegerField(default=0) # Bytes received so far
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f'{self.upload_id}.part')
+
+    @property
+    def is_complete(self):
+        return self.offset == self.size
+
+    def delete(self, *args, **kwargs):
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+        return super().delete(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size} bytes) by {self.user.username}"
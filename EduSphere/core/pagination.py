@@ -0,0 +1,39 @@
+# core/pagination.py
+
+"""
+Keyset ("seek") pagination by primary key.
+
+Pages are addressed by the pk of the row just outside them (?after=<pk> or
+?before=<pk>) instead of an OFFSET, so every page costs one indexed range
+query however deep it is, and rows added meanwhile never shift a page.
+"""
+
+
+def parse_cursor(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, after=None, before=None, size=50):
+    """
+    Return (rows, previous_cursor, next_cursor) for one page of ``queryset``
+    in pk order: the ``size`` rows after pk ``after``, or before pk
+    ``before``, or the first page. A cursor is None when there is no page
+    in that direction (the previous cursor assumes rows exist before any
+    ``after`` page, to save a query).
+    """
+    if before is not None:
+        rows = list(queryset.filter(pk__lt=before).order_by('-pk')[:size + 1])
+        has_previous, has_next = len(rows) > size, True
+        rows = rows[:size][::-1]
+    else:
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        rows = list(queryset.order_by('pk')[:size + 1])
+        has_previous, has_next = after is not None, len(rows) > size
+        rows = rows[:size]
+    if not rows:
+        return rows, None, None
+    return rows, rows[0].pk if has_previous else None, rows[-1].pk if has_next else None
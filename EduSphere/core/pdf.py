@@ -0,0 +1,109 @@
+# core/pdf.py
+
+"""
+A minimal PDF writer for simple text documents such as transcripts.
+
+Only what the transcripts need: A4 pages, the built-in Helvetica fonts
+(no embedding), text and horizontal rules. Text is encoded as cp1252, and
+characters outside it are replaced.
+"""
+
+import zlib
+
+PAGE_WIDTH = 595  # A4 in points
+PAGE_HEIGHT = 842
+MARGIN = 50
+
+_FONTS = {False: 'F1', True: 'F2'}  # Helvetica, Helvetica-Bold
+# Average glyph width as a fraction of the font size; only used to right-align.
+_AVERAGE_WIDTH = 0.5
+
+
+def _escape(text):
+    data = str(text).encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+class SimplePDF:
+    """
+    Build a document by writing lines top to bottom; pages break automatically.
+
+        pdf = SimplePDF()
+        pdf.write_line('Title', size=16, bold=True)
+        pdf.write_columns([('Name', 50), ('Score', 400)])
+        data = pdf.render()
+    """
+    def __init__(self, line_gap=4):
+        self.pages = []
+        self.line_gap = line_gap
+        self._ops = None
+        self.y = 0
+        self.new_page()
+
+    def new_page(self):
+        self._ops = []
+        self.pages.append(self._ops)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def _advance(self, height):
+        if self.y - height < MARGIN:
+            self.new_page()
+        self.y -= height
+
+    def _text(self, x, text, size, bold):
+        self._ops.append(
+            b'BT /%s %d Tf %.2f %.2f Td (%s) Tj ET' % (_FONTS[bold].encode(), size, x, self.y, _escape(text))
+        )
+
+    def write_line(self, text, size=10, bold=False, x=MARGIN):
+        self._advance(size + self.line_gap)
+        self._text(x, text, size, bold)
+
+    def write_columns(self, cells, size=10, bold=False):
+        """Write one line of (text, x) cells; a negative x right-aligns the text at -x."""
+        self._advance(size + self.line_gap)
+        for text, x in cells:
+            if x < 0:
+                x = -x - len(str(text)) * size * _AVERAGE_WIDTH
+            self._text(x, text, size, bold)
+
+    def rule(self, gap=4):
+        self._advance(gap)
+        self._ops.append(b'0.5 w %d %.2f m %d %.2f l S' % (MARGIN, self.y, PAGE_WIDTH - MARGIN, self.y))
+        self._advance(gap)
+
+    def space(self, height=8):
+        self._advance(height)
+
+    def render(self):
+        """Return the finished document as bytes."""
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            None,  # Pages, filled in once the page objects are numbered
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        ]
+        page_ids = []
+        for ops in self.pages:
+            stream = zlib.compress(b'\n'.join(ops))
+            objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+            objects.append(
+                b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R '
+                b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>' % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+            )
+            page_ids.append(len(objects))
+        objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % page_id for page_id in page_ids), len(page_ids),
+        )
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+        xref = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        for offset in offsets:
+            out += b'%010d 00000 n \n' % offset
+        out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+        return bytes(out)
@@ -0,0 +1,67 @@
+# core/reminders.py
+
+"""
+Reminders before assignment and quiz deadlines.
+
+For each assessment due soon, one query finds the enrolled students who
+have neither handed it in nor been reminded already (NOT EXISTS on both).
+Reminders and their notifications are then written with bulk_create(), so
+rerunning the job only sends what is new. Each assessment is handled in its
+own transaction holding a lock on its row, so overlapping runs cannot both
+notify the same student.
+"""
+
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import Assignment, AssignmentSubmission, DueReminder, Enrollment, Notification, Quiz, QuizAttempt
+
+# (assessment model, model recording a hand-in, DueReminder field)
+ASSESSMENTS = [
+    (Assignment, AssignmentSubmission, 'assignment'),
+    (Quiz, QuizAttempt, 'quiz'),
+]
+
+
+def due_soon(hours, now=None):
+    """Yield (assessment, hand-in model, field) for every assignment and quiz due within ``hours``."""
+    now = now or timezone.now()
+    for model, handed_in, field in ASSESSMENTS:
+        for assessment in model.objects.filter(
+            due_date__gt=now, due_date__lte=now + timedelta(hours=hours)
+        ).select_related('subject'):
+            yield assessment, handed_in, field
+
+
+def students_to_remind(assessment, handed_in, field):
+    """(student_id, user_id) for enrolled students with no hand-in and no reminder for ``assessment``."""
+    return Enrollment.objects.filter(course_id=assessment.subject.course_id).exclude(
+        models.Exists(handed_in.objects.filter(**{field: assessment, 'student_id': models.OuterRef('student_id')}))
+    ).exclude(
+        models.Exists(DueReminder.objects.filter(**{field: assessment, 'student_id': models.OuterRef('student_id')}))
+    ).values_list('student_id', 'student__user_id')
+
+
+def send_due_reminders(hours, dry_run=False):
+    """Remind students about assessments due within ``hours``. Returns the number of reminders."""
+    sent = 0
+    for assessment, handed_in, field in due_soon(hours):
+        due = timezone.localtime(assessment.due_date).strftime('%d %b %Y, %H:%M')
+        message = f"Reminder: {field} '{assessment.title}' for {assessment.subject.title} is due on {due}."
+        with transaction.atomic():
+            if not dry_run:
+                # Overlapping runs take turns per assessment, so the later one
+                # sees the reminders the earlier one wrote and skips those students.
+                type(assessment).objects.select_for_update().only('pk').get(pk=assessment.pk)
+            students = list(students_to_remind(assessment, handed_in, field))
+            if not dry_run and students:
+                DueReminder.objects.bulk_create([
+                    DueReminder(student_id=student_id, **{field: assessment}) for student_id, _ in students
+                ], batch_size=1000, ignore_conflicts=True)
+                Notification.objects.bulk_create([
+                    Notification(recipient_id=user_id, message=message) for _, user_id in students
+                ], batch_size=1000)
+        sent += len(students)
+    return sent
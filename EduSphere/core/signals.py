@@ -0,0 +1,155 @@
+# core/signals.py
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .attendance import clear_lecture, invalidate_attendance_summary, update_bitmaps
+from .counters import adjust_count, schedule_refresh
+from .course_content import bump_course_version
+from .gpa import schedule_recompute
+from .models import (
+    Assignment, AssignmentSubmission, Attendance, LearningResource, Question, Quiz, QuizAttempt, StudentGrade, Subject,
+)
+from .stats import invalidate_quiz_score_summary
+from .transcripts import (
+    refresh_assignment_details, refresh_attempt_entries, refresh_quiz_details, refresh_submission_entries,
+)
+
+
+def is_cascade(sender, origin):
+    """True if a post_delete for ``sender`` comes from deleting a parent row rather than the row itself."""
+    if isinstance(origin, QuerySet):
+        return origin.model is not sender
+    return not isinstance(origin, sender)
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def submission_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        refresh_submission_entries([instance])
+        if created:
+            adjust_count(Assignment, 'submission_count', instance.assignment_id, 1)
+
+
+@receiver(post_delete, sender=AssignmentSubmission)
+def submission_deleted(sender, instance, origin=None, **kwargs):
+    if is_cascade(sender, origin):
+        # One recount after the whole cascade rather than an UPDATE per row.
+        schedule_refresh(Assignment, [instance.assignment_id])
+    else:
+        adjust_count(Assignment, 'submission_count', instance.assignment_id, -1)
+
+
+@receiver(post_save, sender=QuizAttempt)
+def quiz_attempt_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        refresh_attempt_entries([instance])
+        if created:
+            adjust_count(Quiz, 'attempt_count', instance.quiz_id, 1)
+
+
+@receiver(post_delete, sender=QuizAttempt)
+def quiz_attempt_deleted(sender, instance, origin=None, **kwargs):
+    if is_cascade(sender, origin):
+        # One recount after the whole cascade rather than an UPDATE per row.
+        schedule_refresh(Quiz, [instance.quiz_id])
+    else:
+        adjust_count(Quiz, 'attempt_count', instance.quiz_id, -1)
+
+
+@receiver(post_save, sender=Assignment)
+def assignment_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        refresh_assignment_details(instance)
+
+
+@receiver(post_save, sender=Quiz)
+def quiz_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        refresh_quiz_details(instance.pk)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, raw=False, origin=None, **kwargs):
+    # Question marks make up the quiz total shown on transcripts and the
+    # range of the cached score histogram. Questions deleted along with their
+    # quiz need neither.
+    if not raw and not (origin is not None and is_cascade(sender, origin)):
+        refresh_quiz_details(instance.quiz_id)
+        invalidate_quiz_score_summary(instance.quiz_id)
+
+
+@receiver(post_save, sender=StudentGrade)
+def student_grade_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_recompute([instance.student_id])
+
+
+@receiver(post_delete, sender=StudentGrade)
+def student_grade_deleted(sender, instance, origin=None, **kwargs):
+    # Grades deleted with their subject are handled once in subject_deleting().
+    if not is_cascade(sender, origin):
+        schedule_recompute([instance.student_id])
+
+
+@receiver(pre_save, sender=Subject)
+def subject_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Credits weight every GPA that includes this subject; other edits
+    # (title, code...) leave GPAs and ranks alone.
+    instance._credits_changed = (
+        not raw and instance.pk is not None and (update_fields is None or 'credits' in update_fields)
+        and Subject.objects.filter(pk=instance.pk).exclude(credits=instance.credits).exists()
+    )
+
+
+@receiver(post_save, sender=Subject)
+def subject_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created and getattr(instance, '_credits_changed', False):
+        schedule_recompute(instance.grades.values_list('student_id', flat=True))
+
+
+@receiver(pre_delete, sender=Subject)
+def subject_deleting(sender, instance, **kwargs):
+    # The subject's grades are about to go; the GPAs they counted towards
+    # are recomputed once the deletion commits.
+    schedule_recompute(instance.grades.values_list('student_id', flat=True))
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, raw=False, **kwargs):
+    # Single-row saves only; record_session() updates bitmaps for whole lectures.
+    if not raw:
+        update_bitmaps(instance.subject, [(instance.student_id, instance.date, instance.status)])
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, origin=None, **kwargs):
+    if is_cascade(sender, origin):
+        # Deleting the student or subject deletes their bitmaps too; only the
+        # cached summary needs to go.
+        invalidate_attendance_summary(instance.subject_id)
+    else:
+        clear_lecture(instance.subject_id, instance.student_id, instance.date)
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def subject_content_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_course_version(instance.course_id)
+
+
+@receiver(post_save, sender=LearningResource)
+@receiver(post_delete, sender=LearningResource)
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def course_content_changed(sender, instance, raw=False, **kwargs):
+    # Shown on the student course page, cached per course version.
+    if not raw:
+        course_id = Subject.objects.filter(pk=instance.subject_id).values_list('course_id', flat=True).first()
+        if course_id is not None:
+            bump_course_version(course_id)
@@ -0,0 +1,232 @@
+# core/similarity.py
+
+"""
+Near-duplicate detection for assignment submissions.
+
+Each submission's text is reduced to a MinHash signature once; locality
+sensitive hashing (LSH) banding then finds candidate pairs per assignment
+without comparing every pair, and only candidates are scored.
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import random
+import re
+import struct
+import zipfile
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .models import AssignmentSubmission, SimilarityFlag, SubmissionFingerprint
+
+NUM_PERMUTATIONS = 128
+BANDS = 32 # 32 bands x 4 rows: pairs above ~0.45 similarity almost always collide
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 5 # words
+SIMILARITY_THRESHOLD = 0.5
+MAX_TEXT_BYTES = 20 * 1024 ** 2
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed seed: signatures must stay comparable across runs and processes.
+_rng = random.Random(20240917)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_TEXT_EXTENSIONS = {
+    '.txt', '.md', '.csv', '.tex', '.html', '.htm', '.xml', '.json', '.rtf',
+    '.py', '.java', '.c', '.cpp', '.h', '.js', '.ts', '.sql', '.r', '.m', '.ipynb',
+}
+_XML_DOCUMENTS = {
+    '.docx': ('word/document.xml',),
+    '.pptx': ('ppt/slides/',),
+    '.odt': ('content.xml',),
+    '.odp': ('content.xml',),
+}
+_WORD_RE = re.compile(r'\w+')
+_TAG_RE = re.compile(rb'<[^>]+>')
+_PDF_STREAM_RE = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+_PDF_TEXT_RE = re.compile(rb'\(((?:[^()\\]|\\.)*)\)')
+
+
+def _pdf_text(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        PdfReader = None
+    if PdfReader is not None:
+        return ' '.join(page.extract_text() or '' for page in PdfReader(io.BytesIO(data)).pages)
+
+    # Without pypdf, pull the string operands out of (mostly Flate-compressed)
+    # content streams. Crude, but enough to compare documents with each other.
+    pieces = []
+    for stream in _PDF_STREAM_RE.findall(data):
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        pieces.extend(_PDF_TEXT_RE.findall(stream))
+    return b' '.join(pieces).decode('latin-1')
+
+
+def extract_text(path, compressed=False):
+    """Best-effort plain text for a stored file, or '' for unsupported formats."""
+    ext = os.path.splitext(path)[1].lower()
+    opener = gzip.open if compressed else open
+    with opener(path, 'rb') as f:
+        data = f.read(MAX_TEXT_BYTES)
+    if ext in _TEXT_EXTENSIONS:
+        return data.decode('utf-8', errors='ignore')
+    if ext in _XML_DOCUMENTS:
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                parts = [
+                    archive.read(name) for name in archive.namelist()
+                    if name.startswith(_XML_DOCUMENTS[ext]) and name.endswith('.xml')
+                ]
+        except zipfile.BadZipFile:
+            return ''
+        return _TAG_RE.sub(b' ', b' '.join(parts)).decode('utf-8', errors='ignore')
+    if ext == '.pdf':
+        return _pdf_text(data)
+    return ''
+
+
+def minhash(text):
+    """Return (signature, shingle_count) for ``text``; the signature is b'' if it has no shingles."""
+    words = _WORD_RE.findall(text.lower())
+    shingles = {
+        int.from_bytes(hashlib.blake2b(' '.join(words[i:i + SHINGLE_SIZE]).encode(), digest_size=8).digest(), 'little')
+        for i in range(max(len(words) - SHINGLE_SIZE + 1, 1 if words else 0))
+    }
+    if not shingles:
+        return b'', 0
+    signature = [
+        min((a * shingle + b) % _MERSENNE_PRIME for shingle in shingles)
+        for a, b in _PERMUTATIONS
+    ]
+    return struct.pack(f'<{NUM_PERMUTATIONS}Q', *signature), len(shingles)
+
+
+def fingerprint_file(path, compressed=False):
+    """Process pool worker: extract and MinHash one file. Uses no Django state."""
+    try:
+        return minhash(extract_text(path, compressed))
+    except Exception:
+        # Unreadable or malformed files (pypdf raises its own errors, zipfile
+        # and gzip others) must not abort the whole run: record them as
+        # having no signature, so they are never compared.
+        return b'', 0
+
+
+def estimate_similarity(sig_a, sig_b):
+    a = struct.unpack(f'<{NUM_PERMUTATIONS}Q', sig_a)
+    b = struct.unpack(f'<{NUM_PERMUTATIONS}Q', sig_b)
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERMUTATIONS
+
+
+def candidate_pairs(signatures):
+    """LSH banding: yield (pk_a, pk_b) pairs that share at least one identical band."""
+    seen = set()
+    for band in range(BANDS):
+        start, end = band * ROWS_PER_BAND * 8, (band + 1) * ROWS_PER_BAND * 8
+        buckets = defaultdict(list)
+        for pk, signature in signatures.items():
+            buckets[signature[start:end]].append(pk)
+        for members in buckets.values():
+            for i, pk_a in enumerate(members):
+                for pk_b in members[i + 1:]:
+                    pair = (min(pk_a, pk_b), max(pk_a, pk_b))
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+
+def fingerprint_new_submissions(assignment, workers=None):
+    """Compute fingerprints for submissions that do not have one yet; return their pks."""
+    pending = list(
+        AssignmentSubmission.objects.filter(assignment=assignment, fingerprint__isnull=True)
+        .values_list('pk', 'submitted_file')
+    )
+    if not pending:
+        return set()
+
+    is_compressed = getattr(default_storage, 'is_compressed', lambda name: False)
+    paths = [default_storage.path(name) for _, name in pending]
+    compressed = [is_compressed(name) for _, name in pending]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(fingerprint_file, paths, compressed, chunksize=8))
+
+    SubmissionFingerprint.objects.bulk_create([
+        SubmissionFingerprint(submission_id=pk, signature=signature, shingle_count=count)
+        for (pk, _), (signature, count) in zip(pending, results)
+    ], ignore_conflicts=True)
+    return {pk for pk, _ in pending}
+
+
+def detect_similar_submissions(assignment, workers=None, threshold=SIMILARITY_THRESHOLD):
+    """
+    Fingerprint any new submissions to ``assignment`` and flag near-duplicate
+    pairs involving them. Pairs between already-processed submissions were
+    scored on an earlier run and are not revisited. Returns the number of new flags.
+    """
+    new_pks = fingerprint_new_submissions(assignment, workers)
+    if not new_pks:
+        return 0
+
+    signatures = {
+        pk: bytes(signature) for pk, signature in SubmissionFingerprint.objects.filter(
+            submission__assignment=assignment
+        ).exclude(signature=b'').values_list('submission_id', 'signature')
+    }
+    flags = []
+    for pk_a, pk_b in candidate_pairs(signatures):
+        if pk_a not in new_pks and pk_b not in new_pks:
+            continue
+        similarity = estimate_similarity(signatures[pk_a], signatures[pk_b])
+        if similarity >= threshold:
+            flags.append(SimilarityFlag(
+                assignment=assignment, submission_a_id=pk_a, submission_b_id=pk_b, similarity=similarity,
+            ))
+    with transaction.atomic():
+        SimilarityFlag.objects.bulk_create(flags, ignore_conflicts=True)
+    return len(flags)
+
+
+def similarity_clusters(assignment):
+    """
+    Group flagged pairs into clusters of submissions (connected components)
+    for display, each with the highest pairwise similarity inside it.
+    """
+    flags = list(
+        SimilarityFlag.objects.filter(assignment=assignment)
+        .select_related('submission_a__student__user', 'submission_b__student__user')
+    )
+    parent = {}
+
+    def find(pk):
+        while parent.setdefault(pk, pk) != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    submissions = {}
+    for flag in flags:
+        submissions[flag.submission_a_id] = flag.submission_a
+        submissions[flag.submission_b_id] = flag.submission_b
+        parent[find(flag.submission_a_id)] = find(flag.submission_b_id)
+
+    clusters = defaultdict(lambda: {'submissions': [], 'max_similarity': 0.0})
+    for pk, submission in submissions.items():
+        clusters[find(pk)]['submissions'].append(submission)
+    for flag in flags:
+        cluster = clusters[find(flag.submission_a_id)]
+        cluster['max_similarity'] = max(cluster['max_similarity'], flag.similarity)
+    return sorted(clusters.values(), key=lambda cluster: -cluster['max_similarity'])
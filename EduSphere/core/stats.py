@@ -0,0 +1,88 @@
+# core/stats.py
+
+from django.core.cache import cache
+from django.db import models
+
+# Summaries are invalidated explicitly whenever an attempt is created or re-graded;
+# the timeout is only a safety net against a missed invalidation.
+SCORE_SUMMARY_TIMEOUT = 60 * 60
+HISTOGRAM_BINS = 10
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list (pct in 0-100)."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def score_summary(sorted_scores, total_marks, bins=HISTOGRAM_BINS):
+    """
+    Build the distribution summary for a sorted list of scores in one pass:
+    count, mean, min/max, median, quartiles, P90 and an equal-width histogram
+    over 0..total_marks.
+    """
+    count = len(sorted_scores)
+    summary = {
+        'count': count,
+        'total_marks': total_marks,
+        'mean': None, 'median': None, 'min': None, 'max': None,
+        'p25': None, 'p75': None, 'p90': None,
+        'histogram': [],
+    }
+    if not count:
+        return summary
+
+    # Scores can exceed the question total if it was edited after grading.
+    upper = max(total_marks, sorted_scores[-1], 1)
+    width = upper / bins
+    counts = [0] * bins
+    running_total = 0
+    for score in sorted_scores:
+        running_total += score
+        counts[min(int(score / width), bins - 1)] += 1
+
+    tallest = max(counts)
+    summary.update({
+        'mean': running_total / count,
+        'median': percentile(sorted_scores, 50),
+        'min': sorted_scores[0],
+        'max': sorted_scores[-1],
+        'p25': percentile(sorted_scores, 25),
+        'p75': percentile(sorted_scores, 75),
+        'p90': percentile(sorted_scores, 90),
+        'histogram': [
+            {
+                'low': round(i * width, 1),
+                'high': round((i + 1) * width, 1),
+                'count': bin_count,
+                'percent': round(100 * bin_count / tallest),
+            }
+            for i, bin_count in enumerate(counts)
+        ],
+    })
+    return summary
+
+
+def _quiz_summary_key(quiz_pk):
+    return f'quiz_score_summary:{quiz_pk}'
+
+
+def quiz_score_summary(quiz):
+    """Cached score distribution for all attempts on a quiz."""
+    key = _quiz_summary_key(quiz.pk)
+    summary = cache.get(key)
+    if summary is None:
+        scores = list(quiz.attempts.order_by('score').values_list('score', flat=True))
+        total_marks = quiz.questions.aggregate(total=models.Sum('marks'))['total'] or 0
+        summary = score_summary(scores, total_marks)
+        cache.set(key, summary, SCORE_SUMMARY_TIMEOUT)
+    return summary
+
+
+def invalidate_quiz_score_summary(quiz_pk):
+    cache.delete(_quiz_summary_key(quiz_pk))
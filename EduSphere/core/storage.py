@@ -0,0 +1,258 @@
+# core/storage.py
+
+import errno
+import gzip
+import hashlib
+import mimetypes
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+# Written into the gzip FNAME header field so compressed blobs can be told
+# apart from user uploads that merely happen to be gzip files.
+COMPRESSED_MARKER = b'edusphere-cas'
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/xml', 'application/javascript',
+    'image/svg+xml', 'application/x-tex', 'application/rtf',
+)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that keeps a single copy of each distinct upload.
+
+    Uploads are SHA-256 hashed while their chunks are streamed to a temporary
+    file, then kept once under ``<blob_location>/<ab>/<digest>``. Every saved
+    name is a hard link to its blob, so names, URLs and FileFields behave
+    exactly as with FileSystemStorage, and the inode link count is the
+    reference count: deleting the last name also deletes the blob.
+
+    ``blob_location`` (settings.BLOB_ROOT by default) must be outside
+    MEDIA_ROOT, so blobs are never served by digest, but on the same file
+    system, so they can be hard linked (otherwise names are stored as plain
+    copies and nothing is deduplicated). For each name a reference file under
+    ``<blob_location>/refs/`` records its blob and uncompressed size, which lets
+    delete() and size() work without reading the file.
+
+    With ``compress=True``, compressible types (text, CSV, JSON, SVG...) are
+    stored gzipped and decompressed transparently by open(). Such files must be
+    served through the storage API rather than directly from MEDIA_ROOT.
+    """
+    def __init__(self, *args, blob_location=None, compress=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._blob_location = blob_location
+        self.compress = compress
+
+    @cached_property
+    def blob_location(self):
+        return os.path.abspath(self._value_or_setting(self._blob_location, settings.BLOB_ROOT))
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'BLOB_ROOT':
+            self.__dict__.pop('blob_location', None)
+
+    def _makedirs(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(directory, self.directory_permissions_mode)
+
+    def _blob_path(self, digest, compressed):
+        suffix = '.gz' if compressed else ''
+        return os.path.join(self.blob_location, digest[:2], digest + suffix)
+
+    def _ref_path(self, name):
+        # path() rejects names that escape the storage location.
+        relative = os.path.relpath(self.path(name), self.location)
+        return os.path.join(self.blob_location, 'refs', relative + '.ref')
+
+    def _write_ref(self, name, blob_path, size):
+        ref_path = self._ref_path(name)
+        self._makedirs(os.path.dirname(ref_path))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(ref_path))
+        with os.fdopen(fd, 'w') as f:
+            f.write(f'{os.path.relpath(blob_path, self.blob_location)}\n{size}\n')
+        os.replace(tmp_path, ref_path)
+
+    def _read_ref(self, name):
+        """The (blob path, uncompressed size) recorded for ``name``, or None."""
+        try:
+            with open(self._ref_path(name)) as f:
+                blob, size = f.read().split()
+        except (FileNotFoundError, ValueError):
+            return None
+        return os.path.join(self.blob_location, blob), int(size)
+
+    def should_compress(self, name):
+        content_type, _ = mimetypes.guess_type(name)
+        return self.compress and content_type is not None and content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def is_compressed(self, name):
+        """True if the stored bytes for ``name`` are a gzipped blob."""
+        ref = self._read_ref(name)
+        if ref is not None:
+            return ref[0].endswith('.gz')
+        try:
+            with open(self.path(name), 'rb') as f:
+                header = f.read(10 + len(COMPRESSED_MARKER) + 1)
+        except FileNotFoundError:
+            return False
+        # Magic, deflate method, FNAME flag, then the NUL-terminated name.
+        return (
+            header[:3] == b'\x1f\x8b\x08' and header[3] & 0x08
+            and header[10:] == COMPRESSED_MARKER + b'\x00'
+        )
+
+    def _write_temporary_blob(self, content, compressed):
+        """Stream ``content`` into a temporary file in the blob directory, hashing as it goes."""
+        tmp_dir = os.path.join(self.blob_location, 'tmp')
+        self._makedirs(tmp_dir)
+        sha256 = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                out = gzip.GzipFile(filename=COMPRESSED_MARKER.decode(), mode='wb', fileobj=raw, mtime=0) if compressed else raw
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+                if compressed:
+                    out.close()
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return sha256.hexdigest(), tmp_path, size
+
+    def _link_blob(self, source, digest, compressed):
+        """Link ``source`` into place as the blob for ``digest``, unless that blob already exists."""
+        blob_path = self._blob_path(digest, compressed)
+        self._makedirs(os.path.dirname(blob_path))
+        try:
+            # link() never overwrites, so a concurrent upload of the same content
+            # cannot swap the blob's inode out from under existing names.
+            os.link(source, blob_path)
+        except FileExistsError:
+            pass
+        else:
+            if self.file_permissions_mode is not None:
+                os.chmod(blob_path, self.file_permissions_mode)
+        return blob_path
+
+    def _place(self, blob_path, full_path):
+        """Hard link the blob to ``full_path``, or copy it there if they are on different file systems."""
+        try:
+            os.link(blob_path, full_path)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        # No deduplication for this name, but the upload still succeeds. 'x'
+        # keeps link()'s refusal to overwrite an existing name.
+        with open(blob_path, 'rb') as src, open(full_path, 'xb') as dst:
+            try:
+                shutil.copyfileobj(src, dst)
+            except BaseException:
+                dst.close()
+                os.remove(full_path)
+                raise
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+
+    def _save(self, name, content):
+        compressed = self.should_compress(name)
+        source = None
+        if getattr(content, 'sha256', None) and hasattr(content, 'temporary_file_path') and not compressed:
+            # Already hashed on disk (e.g. a finished chunked upload): adopt the
+            # file as the blob without reading it again.
+            try:
+                self._link_blob(content.temporary_file_path(), content.sha256, compressed)
+            except OSError:
+                # Most likely on another file system; fall back to streaming it.
+                content.seek(0)
+            else:
+                source, digest = content.temporary_file_path(), content.sha256
+                size = os.path.getsize(source)
+        if source is None:
+            digest, source, size = self._write_temporary_blob(content, compressed)
+
+        try:
+            full_path = self.path(name)
+            self._makedirs(os.path.dirname(full_path))
+            while True:
+                blob_path = self._link_blob(source, digest, compressed)
+                try:
+                    self._place(blob_path, full_path)
+                except FileExistsError:
+                    # Same race handling as FileSystemStorage: pick another name.
+                    name = self.get_available_name(name)
+                    full_path = self.path(name)
+                except FileNotFoundError:
+                    # The blob went away with its last name in the meantime;
+                    # put it back from the source and try again.
+                    continue
+                else:
+                    break
+        finally:
+            os.remove(source)
+
+        name = str(os.path.relpath(full_path, self.location)).replace('\\', '/')
+        self._write_ref(name, blob_path, size)
+        return name
+
+    def _open(self, name, mode='rb'):
+        if 'b' in mode and not any(flag in mode for flag in 'wa+') and self.is_compressed(name):
+            return File(gzip.open(self.path(name), 'rb'), name=name)
+        return super()._open(name, mode)
+
+    def size(self, name):
+        ref = self._read_ref(name)
+        if ref is not None:
+            return ref[1]
+        if self.is_compressed(name):
+            # Saved before sizes were recorded; the gzip trailer only holds the
+            # size modulo 2**32, so count the decompressed bytes instead.
+            with self.open(name) as f:
+                return sum(len(chunk) for chunk in f.chunks())
+        return super().size(name)
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        ref = self._read_ref(name)
+        super().delete(name)
+        if ref is None:
+            # Not saved by this storage, or saved before references were
+            # recorded; collect_orphan_blobs() removes its blob once unused.
+            return
+        try:
+            os.remove(self._ref_path(name))
+        except FileNotFoundError:
+            pass
+        try:
+            # Only the blob's own link is left once no name shares it.
+            if os.stat(ref[0]).st_nlink == 1:
+                os.remove(ref[0])
+        except FileNotFoundError:
+            pass
+
+    def collect_orphan_blobs(self):
+        """Delete blobs no saved name links to any more; returns how many were removed."""
+        removed = 0
+        for entry in os.scandir(self.blob_location) if os.path.isdir(self.blob_location) else []:
+            if not entry.is_dir() or entry.name in ('refs', 'tmp'):
+                continue
+            for blob in os.scandir(entry.path):
+                if blob.is_file() and blob.stat().st_nlink == 1:
+                    os.remove(blob.path)
+                    removed += 1
+        return removed
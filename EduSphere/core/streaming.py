@@ -0,0 +1,69 @@
+# core/streaming.py
+
+import zipfile
+
+
+class _ZipSink:
+    """
+    Write-only, non-seekable file object handed to ZipFile. It has tell() but
+    no seek(), so ZipFile writes data descriptors instead of seeking back, and
+    every byte written can be drained and yielded immediately.
+    """
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_chunks(entries):
+    sink = _ZipSink()
+    missing = []
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for arcname, fieldfile in entries:
+            try:
+                fieldfile.open('rb')
+            except OSError:
+                missing.append(arcname)
+                continue
+            try:
+                info = zipfile.ZipInfo(arcname)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                # Lets ZipFile decide on zip64 headers up front for files over 2 GB.
+                info.file_size = fieldfile.size
+                with archive.open(info, mode='w') as member:
+                    for chunk in fieldfile.chunks():
+                        member.write(chunk)
+                        yield sink.drain()
+            finally:
+                fieldfile.close()
+            yield sink.drain()
+        if missing:
+            archive.writestr('MISSING.txt', 'These files could not be found in storage:\n' + '\n'.join(missing) + '\n')
+    yield sink.drain()
+
+
+def stream_zip(entries):
+    """
+    Generate a ZIP archive incrementally from (arcname, fieldfile) pairs.
+
+    Each file is read from storage chunk by chunk and its compressed bytes are
+    yielded as soon as they are produced, so memory use stays constant no matter
+    how large the archive is. Files that can no longer be opened are listed in
+    a MISSING.txt entry at the end instead of aborting the download.
+    """
+    return (chunk for chunk in _zip_chunks(entries) if chunk)
@@ -1,3 +1,540 @@
-from django.test import TestCase
+import errno
+import importlib
+import os
+import shutil
+import tempfile
+from contextlib import suppress
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings as django_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+
+from . import checkin, gpa
+from .gpa import recompute_students
+from .models import (
+    Assignment, AssignmentSubmission, Attendance, ChunkedUpload, Course, Department, Enrollment, Faculty, MCQOption,
+    Question, Quiz, QuizAttempt, Student, StudentAnswer, StudentCGPA, StudentGrade, Subject, University,
+)
+from .storage import ContentAddressedStorage
+from .views import ChunkedUploadFinalizeView, SubmissionListView
+
+
+class QuizFixtureMixin:
+    """A quiz with two MCQ questions (2 and 3 marks) and one descriptive question (5 marks)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        university = University.objects.create(name='Test University')
+        department = Department.objects.create(name='CS', university=university)
+        cls.faculty_user = User.objects.create_user(username='teacher', password='pw')
+        faculty = Faculty.objects.create(user=cls.faculty_user, university=university, department=department, employee_id='E1')
+        course = Course.objects.create(title='MSc', code='MSC', department=department, university=university)
+        subject = Subject.objects.create(title='Algorithms', code='ALG', course=course)
+        subject.faculty.add(faculty)
+        cls.student_user = User.objects.create_user(username='student', password='pw')
+        cls.student = Student.objects.create(user=cls.student_user, university=university, student_id='S1')
+        Enrollment.objects.create(student=cls.student, course=course, roll_number='1')
+
+        cls.quiz = Quiz.objects.create(subject=subject, title='Quiz 1', due_date=timezone.now())
+        cls.q1 = Question.objects.create(quiz=cls.quiz, text='2 + 2', question_type='MCQ', marks=2)
+        cls.q1_wrong = MCQOption.objects.create(question=cls.q1, text='3')
+        cls.q1_right = MCQOption.objects.create(question=cls.q1, text='4', is_correct=True)
+        cls.q2 = Question.objects.create(quiz=cls.quiz, text='3 + 3', question_type='MCQ', marks=3)
+        cls.q2_wrong = MCQOption.objects.create(question=cls.q2, text='5')
+        cls.q2_right = MCQOption.objects.create(question=cls.q2, text='6', is_correct=True)
+        cls.q3 = Question.objects.create(quiz=cls.quiz, text='Explain', question_type='DESCRIPTIVE', marks=5)
+
+    def make_attempt(self, options):
+        attempt = QuizAttempt(quiz=self.quiz, student=self.student, score=0)
+        attempt.pack_mcq_choices(options)
+        attempt.save()
+        return QuizAttempt.objects.get(pk=attempt.pk)
+
+
+class PackedMCQChoicesTests(QuizFixtureMixin, TestCase):
+    def test_pack_then_unpack_round_trip(self):
+        attempt = self.make_attempt([self.q2_right, self.q1_wrong])
+        self.assertEqual(attempt.get_mcq_choice_ids(), sorted([self.q2_right.pk, self.q1_wrong.pk]))
+        answers = attempt.get_answers()
+        self.assertEqual([answer.question_id for answer in answers], [self.q1.pk, self.q2.pk])
+        self.assertEqual([answer.mcq_option for answer in answers], [self.q1_wrong, self.q2_right])
+
+    def test_no_choices(self):
+        attempt = self.make_attempt([])
+        self.assertEqual(attempt.get_mcq_choice_ids(), [])
+        self.assertEqual(attempt.get_answers(), [])
+        self.assertEqual(attempt.get_mcq_score(), 0)
+
+    def test_score_counts_only_correct_options(self):
+        attempt = self.make_attempt([self.q1_right, self.q2_wrong])
+        self.assertEqual(attempt.get_mcq_score(), 2)
+
+    def test_score_with_unanswered_question(self):
+        attempt = self.make_attempt([self.q2_right])
+        self.assertEqual(attempt.get_mcq_score(), 3)
+        self.assertEqual(len(attempt.get_answers()), 1)
+
+    def test_score_with_deleted_option(self):
+        attempt = self.make_attempt([self.q1_right, self.q2_right])
+        deleted_pk = self.q2_right.pk
+        self.q2_right.delete()
+        attempt = QuizAttempt.objects.get(pk=attempt.pk)
+        # The packed id stays behind but no longer resolves to an answer.
+        self.assertEqual(attempt.get_mcq_choice_ids(), sorted([self.q1_right.pk, deleted_pk]))
+        self.assertEqual(attempt.get_mcq_score(), 2)
+        self.assertEqual([answer.question_id for answer in attempt.get_answers()], [self.q1.pk])
+
+    def test_packed_and_row_answers_are_merged(self):
+        attempt = self.make_attempt([self.q1_right])
+        StudentAnswer.objects.create(quiz_attempt=attempt, question=self.q3, descriptive_answer='Because.')
+        attempt = QuizAttempt.objects.get(pk=attempt.pk)
+        self.assertEqual([answer.question_id for answer in attempt.get_answers()], [self.q1.pk, self.q3.pk])
+        self.assertEqual(attempt.get_mcq_score(), 2)
+
+
+class TakeAndGradeQuizTests(QuizFixtureMixin, TestCase):
+    def take_quiz(self):
+        self.client.force_login(self.student_user)
+        response = self.client.post(reverse('core:take_quiz', args=[self.quiz.pk]), {
+            f'question_{self.q1.pk}': self.q1_right.pk,
+            f'question_{self.q2.pk}': self.q2_wrong.pk,
+            f'question_{self.q3.pk}': 'Because.',
+        })
+        attempt = QuizAttempt.objects.get(quiz=self.quiz, student=self.student)
+        self.assertRedirects(response, reverse('core:quiz_result', args=[attempt.pk]))
+        return attempt
+
+    def grade(self, attempt, marks):
+        answer = attempt.answers.get(question=self.q3)
+        self.client.force_login(self.faculty_user)
+        response = self.client.post(reverse('core:grade_quiz_attempt', args=[attempt.pk]), {
+            'form-TOTAL_FORMS': '1', 'form-INITIAL_FORMS': '1', 'form-MIN_NUM_FORMS': '0', 'form-MAX_NUM_FORMS': '1000',
+            'form-0-id': answer.pk, 'form-0-marks_awarded': marks,
+        })
+        self.assertRedirects(response, reverse('core:quiz_attempts_list', args=[self.quiz.pk]))
+        attempt.refresh_from_db()
+        return attempt
+
+    def check_take_and_grade(self, packed):
+        attempt = self.take_quiz()
+        self.assertEqual(attempt.score, 2)
+        self.assertEqual(bool(attempt.mcq_choices), packed)
+        self.assertEqual(attempt.answers.filter(mcq_option__isnull=False).count(), 0 if packed else 2)
+        self.assertEqual([answer.question_id for answer in attempt.get_answers()], [self.q1.pk, self.q2.pk, self.q3.pk])
+        self.assertEqual(self.grade(attempt, 4).score, 6)
+
+    @override_settings(PACK_MCQ_ANSWERS=True)
+    def test_take_and_grade_packed(self):
+        self.check_take_and_grade(packed=True)
+
+    @override_settings(PACK_MCQ_ANSWERS=False)
+    def test_take_and_grade_rows(self):
+        self.check_take_and_grade(packed=False)
+
+    @override_settings(PACK_MCQ_ANSWERS=True)
+    def test_result_page_shows_packed_answers(self):
+        attempt = self.take_quiz()
+        response = self.client.get(reverse('core:quiz_result', args=[attempt.pk]))
+        self.assertContains(response, self.q1_right.text)
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.blob_root = os.path.join(root, 'blobs')
+        self.storage = ContentAddressedStorage(
+            location=os.path.join(root, 'media'), blob_location=self.blob_root, compress=True,
+        )
+
+    def blobs(self):
+        return [
+            os.path.join(directory, name)
+            for directory, dirs, names in os.walk(self.blob_root)
+            if os.path.relpath(directory, self.blob_root).split(os.sep)[0] not in ('refs', 'tmp')
+            for name in names
+        ]
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.storage.save('a/report.pdf', ContentFile(b'same bytes'))
+        second = self.storage.save('b/copy.pdf', ContentFile(b'same bytes'))
+        self.storage.save('c/other.pdf', ContentFile(b'other bytes'))
+        self.assertEqual(os.stat(self.storage.path(first)).st_ino, os.stat(self.storage.path(second)).st_ino)
+        self.assertEqual(len(self.blobs()), 2)
+        with self.storage.open(second) as f:
+            self.assertEqual(f.read(), b'same bytes')
+
+    def test_blobs_are_kept_outside_the_media_root(self):
+        self.storage.save('report.pdf', ContentFile(b'data'))
+        self.assertEqual(os.listdir(self.storage.location), ['report.pdf'])
+
+    def test_same_name_gets_another_name(self):
+        first = self.storage.save('report.pdf', ContentFile(b'one'))
+        second = self.storage.save('report.pdf', ContentFile(b'two'))
+        self.assertNotEqual(first, second)
+        with self.storage.open(first) as f:
+            self.assertEqual(f.read(), b'one')
+
+    def test_delete_keeps_a_shared_blob(self):
+        first = self.storage.save('a.pdf', ContentFile(b'shared'))
+        second = self.storage.save('b.pdf', ContentFile(b'shared'))
+        self.storage.delete(first)
+        self.assertFalse(self.storage.exists(first))
+        self.assertEqual(len(self.blobs()), 1)
+        with self.storage.open(second) as f:
+            self.assertEqual(f.read(), b'shared')
+
+        self.storage.delete(second)
+        self.assertFalse(self.storage.exists(second))
+        self.assertEqual(self.blobs(), [])
+        self.assertEqual(os.listdir(os.path.join(self.blob_root, 'refs')), [])
+
+    def test_delete_file_without_reference(self):
+        os.makedirs(self.storage.location)
+        with open(self.storage.path('legacy.pdf'), 'wb') as f:
+            f.write(b'legacy')
+        self.storage.delete('legacy.pdf')
+        self.assertFalse(self.storage.exists('legacy.pdf'))
+
+    def test_save_after_blob_was_deleted(self):
+        name = self.storage.save('a.pdf', ContentFile(b'again'))
+        self.storage.delete(name)
+        name = self.storage.save('a.pdf', ContentFile(b'again'))
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b'again')
+        self.assertEqual(len(self.blobs()), 1)
+
+    def test_size(self):
+        plain = self.storage.save('data.pdf', ContentFile(b'x' * 1000))
+        compressed = self.storage.save('data.csv', ContentFile(b'x' * 1000))
+        self.assertFalse(self.storage.is_compressed(plain))
+        self.assertTrue(self.storage.is_compressed(compressed))
+        self.assertLess(os.path.getsize(self.storage.path(compressed)), 1000)
+        self.assertEqual(self.storage.size(plain), 1000)
+        self.assertEqual(self.storage.size(compressed), 1000)
+        with self.storage.open(compressed) as f:
+            self.assertEqual(f.read(), b'x' * 1000)
+
+    def test_size_without_reference(self):
+        name = self.storage.save('data.csv', ContentFile(b'y' * 500))
+        os.remove(self.storage._ref_path(name))
+        self.assertTrue(self.storage.is_compressed(name))
+        self.assertEqual(self.storage.size(name), 500)
+
+    def test_collect_orphan_blobs(self):
+        name = self.storage.save('a.pdf', ContentFile(b'orphan'))
+        os.remove(self.storage.path(name))
+        self.storage.save('b.pdf', ContentFile(b'kept'))
+        self.assertEqual(self.storage.collect_orphan_blobs(), 1)
+        self.assertEqual(len(self.blobs()), 1)
+
+    def test_copies_when_the_media_root_is_on_another_file_system(self):
+        link = os.link
+
+        def cross_device_link(src, dst):
+            if dst.startswith(self.storage.location):
+                raise OSError(errno.EXDEV, 'Invalid cross-device link')
+            return link(src, dst)
+
+        with mock.patch('core.storage.os.link', cross_device_link):
+            first = self.storage.save('a.csv', ContentFile(b'copied'))
+            second = self.storage.save('a.csv', ContentFile(b'copied'))
+        self.assertNotEqual(first, second)
+        self.assertNotEqual(os.stat(self.storage.path(first)).st_ino, os.stat(self.storage.path(second)).st_ino)
+        self.assertEqual(self.storage.size(first), 6)
+        with self.storage.open(second) as f:
+            self.assertEqual(f.read(), b'copied')
+        self.storage.delete(first)
+        with self.storage.open(second) as f:
+            self.assertEqual(f.read(), b'copied')
+
+class GPARecomputeSignalTests(QuizFixtureMixin, TestCase):
+    def setUp(self):
+        self.subject = self.quiz.subject
+        self.other = Subject.objects.create(title='Networks', code='NET', course=self.subject.course, credits=3)
+
+    def patch_recompute(self, **kwargs):
+        # The batch holds its own reference to recompute_students().
+        return mock.patch.object(gpa._pending_students, 'handler', **kwargs)
+
+    def grade(self, subject, points):
+        return StudentGrade.objects.create(student=self.student, subject=subject, grade='A', points=points, percentage=90)
+
+    def test_grades_saved_in_one_transaction_recompute_once(self):
+        with self.patch_recompute() as recompute:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.grade(self.subject, 9)
+                self.grade(self.other, 8)
+        recompute.assert_called_once_with({self.student.pk})
+
+    def test_ids_added_after_a_rolled_back_savepoint_are_kept(self):
+        other_user = User.objects.create_user(username='other', password='pw')
+        other = Student.objects.create(user=other_user, university=self.student.university, student_id='S2')
+        with self.patch_recompute() as recompute:
+            with self.captureOnCommitCallbacks(execute=True):
+                with suppress(IntegrityError), transaction.atomic():
+                    self.grade(self.subject, 9)
+                    self.grade(self.subject, 9)
+                StudentGrade.objects.create(student=other, subject=self.subject, grade='B', points=8, percentage=80)
+        recompute.assert_called_once()
+        self.assertIn(other.pk, recompute.call_args.args[0])
+
+    def test_only_credit_changes_recompute(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grade(self.subject, 9)
+        with self.patch_recompute() as recompute:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.subject.title = 'Advanced Algorithms'
+                self.subject.save()
+            recompute.assert_not_called()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.subject.credits += 1
+                self.subject.save()
+            recompute.assert_called_once_with({self.student.pk})
+
+    def test_deleting_a_subject_recomputes_its_students(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grade(self.subject, 9)
+            self.grade(self.other, 6)
+        self.assertEqual(StudentCGPA.objects.get(student=self.student).credits, 3 + self.subject.credits)
+
+        with self.patch_recompute(wraps=recompute_students) as recompute:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.other.delete()
+        recompute.assert_called_once_with({self.student.pk})
+        cgpa = StudentCGPA.objects.get(student=self.student)
+        self.assertEqual((cgpa.cgpa, cgpa.credits), (Decimal('9.00'), self.subject.credits))
+
+
+class CounterFieldTests(QuizFixtureMixin, TestCase):
+    def test_saving_a_stale_instance_keeps_the_counter(self):
+        stale = Quiz.objects.get(pk=self.quiz.pk)
+        self.make_attempt([])
+        stale.title = 'Renamed'
+        stale.save()
+        self.quiz.refresh_from_db()
+        self.assertEqual((self.quiz.title, self.quiz.attempt_count), ('Renamed', 1))
+
+    def test_deleting_an_attempt_decrements(self):
+        attempt = self.make_attempt([])
+        attempt.delete()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.attempt_count, 0)
+
+    def test_cascade_recounts_once_after_commit(self):
+        self.make_attempt([])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.delete()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.attempt_count, 0)
+
+    def test_deleting_the_quiz_skips_its_attempts(self):
+        self.make_attempt([])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz.delete()
+        self.assertFalse(Quiz.objects.filter(pk=self.quiz.pk).exists())
+
+
+class SubmissionGradingPageTests(QuizFixtureMixin, TestCase):
+    count = 350
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.assignment = Assignment.objects.create(
+            subject=cls.quiz.subject, title='Essay', description='', due_date=timezone.now(), total_marks=10,
+        )
+        users = User.objects.bulk_create([User(username=f'bulk{i}') for i in range(cls.count)])
+        students = Student.objects.bulk_create([
+            Student(user=user, university=cls.student.university, student_id=f'B{i}') for i, user in enumerate(users)
+        ])
+        AssignmentSubmission.objects.bulk_create([
+            AssignmentSubmission(assignment=cls.assignment, student=student, submitted_file='essay.pdf')
+            for student in students
+        ])
+
+    def formset_data(self, submissions, grade):
+        data = {
+            'form-TOTAL_FORMS': len(submissions), 'form-INITIAL_FORMS': len(submissions),
+            'form-MIN_NUM_FORMS': '0', 'form-MAX_NUM_FORMS': '1000',
+        }
+        for i, submission in enumerate(submissions):
+            data.update({f'form-{i}-id': submission.pk, f'form-{i}-grade': grade, f'form-{i}-feedback': ''})
+        return data
+
+    def test_grade_every_page(self):
+        self.client.force_login(self.faculty_user)
+        url = reverse('core:view_submissions', args=[self.assignment.pk])
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            formset = response.context['formset']
+            self.assertLessEqual(len(formset.forms), SubmissionListView.grading_page_size)
+            data = self.formset_data([form.instance for form in formset.forms], 7)
+            self.assertLess(len(data), 1000)
+            self.assertRedirects(self.client.post(url, data), url, fetch_redirect_response=False)
+            next_cursor = response.context['next_cursor']
+            url = next_cursor and reverse('core:view_submissions', args=[self.assignment.pk]) + f'?after={next_cursor}'
+            pages += 1
+        self.assertEqual(pages, 4)
+        self.assertFalse(self.assignment.submissions.filter(grade__isnull=True).exists())
+
+    def test_one_formset_above_the_field_limit_is_rejected(self):
+        self.client.force_login(self.faculty_user)
+        data = self.formset_data(list(self.assignment.submissions.all()), 7)
+        self.assertGreater(len(data), 1000)
+        response = self.client.post(reverse('core:view_submissions', args=[self.assignment.pk]), data)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.assignment.submissions.filter(grade__isnull=False).exists())
+
+    def test_import_accepts_upper_case_extension(self):
+        self.client.force_login(self.faculty_user)
+        upload = SimpleUploadedFile('GRADES.CSV', b'student_id,grade\nB0,9\n', content_type='text/csv')
+        response = self.client.post(reverse('core:import_grades', args=[self.assignment.pk]), {'file': upload})
+        self.assertRedirects(response, reverse('core:view_submissions', args=[self.assignment.pk]), fetch_redirect_response=False)
+        self.assertEqual(self.assignment.submissions.get(student__student_id='B0').grade, 9)
+
+
+
+class ChunkedUploadTests(QuizFixtureMixin, TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings = override_settings(
+            MEDIA_ROOT=os.path.join(root, 'media'), BLOB_ROOT=os.path.join(root, 'blobs'),
+            CHUNKED_UPLOAD_DIR=os.path.join(root, 'uploads'),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.assignment = Assignment.objects.create(
+            subject=self.quiz.subject, title='Essay', description='', due_date=timezone.now(), total_marks=10,
+        )
+        self.client.force_login(self.student_user)
+
+    def start(self, data):
+        response = self.client.post(reverse('core:chunked_upload_init'), {'filename': 'essay.txt', 'size': len(data)})
+        return ChunkedUpload.objects.get(upload_id=response.json()['upload_id'])
+
+    def put(self, upload, offset, data):
+        return self.client.put(
+            reverse('core:chunked_upload_chunk', args=[upload.upload_id]), data,
+            content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def finalize(self, upload):
+        return self.client.post(reverse('core:chunked_upload_finalize', args=[upload.upload_id]), {
+            'target': 'submission', 'assignment': self.assignment.pk,
+        })
+
+    def test_repeated_chunk_is_not_appended_twice(self):
+        upload = self.start(b'hello world')
+        self.assertEqual(self.put(upload, 0, b'hello ').status_code, 200)
+        response = self.put(upload, 0, b'hello ')
+        self.assertEqual((response.status_code, response.json()['offset']), (409, 6))
+        self.put(upload, 6, b'world')
+        with open(upload.temp_path, 'rb') as f:
+            self.assertEqual(f.read(), b'hello world')
+        self.assertEqual(self.finalize(upload).status_code, 200)
+        submission = AssignmentSubmission.objects.get(assignment=self.assignment, student=self.student)
+        with submission.submitted_file.open() as f:
+            self.assertEqual(f.read(), b'hello world')
+
+    def test_partial_uploads_are_kept_outside_the_media_root(self):
+        upload = self.start(b'data')
+        self.put(upload, 0, b'da')
+        self.assertFalse(os.path.abspath(upload.temp_path).startswith(os.path.abspath(django_settings.MEDIA_ROOT)))
+
+    def test_concurrent_submission_returns_conflict(self):
+        upload = self.start(b'data')
+        self.put(upload, 0, b'data')
+        build_submission = ChunkedUploadFinalizeView.build_submission
+
+        def submitted_meanwhile(view, request):
+            result = build_submission(view, request)
+            AssignmentSubmission.objects.create(assignment=self.assignment, student=self.student, submitted_file='x.txt')
+            return result
+
+        with mock.patch.object(ChunkedUploadFinalizeView, 'build_submission', submitted_meanwhile):
+            response = self.finalize(upload)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(AssignmentSubmission.objects.filter(assignment=self.assignment).count(), 1)
+
+
+class ProtectedMediaTests(QuizFixtureMixin, TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings = override_settings(MEDIA_ROOT=os.path.join(root, 'media'), BLOB_ROOT=os.path.join(root, 'blobs'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        assignment = Assignment.objects.create(
+            subject=self.quiz.subject, title='Essay', description='', due_date=timezone.now(), total_marks=10,
+        )
+        self.submission = AssignmentSubmission(assignment=assignment, student=self.student)
+        self.submission.submitted_file.save('essay.txt', ContentFile(b'my essay'))
+        other_user = User.objects.create_user(username='other', password='pw')
+        Student.objects.create(user=other_user, university=self.student.university, student_id='S2')
+        self.client.force_login(other_user)
+
+    @override_settings(DEBUG=True)
+    def test_media_url_does_not_serve_submissions(self):
+        # The URLconf is built at import time, so rebuild it with DEBUG on.
+        importlib.reload(importlib.import_module(django_settings.ROOT_URLCONF))
+        clear_url_caches()
+        response = self.client.get(django_settings.MEDIA_URL + self.submission.submitted_file.name)
+        self.assertEqual(response.status_code, 404)
+
+    def test_submission_view_checks_access(self):
+        response = self.client.get(reverse('core:submission_file', args=[self.submission.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.client.force_login(self.student_user)
+        response = self.client.get(reverse('core:submission_file', args=[self.submission.pk]))
+        self.assertEqual(b''.join(response.streaming_content), b'my essay')
+
+
+class QuestionSignalTests(QuizFixtureMixin, TestCase):
+    def test_deleting_a_question_refreshes_the_quiz(self):
+        with mock.patch('core.signals.refresh_quiz_details') as refresh:
+            self.q3.delete()
+        refresh.assert_called_once_with(self.quiz.pk)
+
+    def test_deleting_the_quiz_skips_the_refresh(self):
+        with mock.patch('core.signals.refresh_quiz_details') as refresh:
+            self.quiz.delete()
+        refresh.assert_not_called()
+
+
+class CheckInTests(QuizFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.subject = self.quiz.subject
+        self.session = checkin.open_checkin(self.subject)
+
+    def test_check_in_does_not_touch_the_database(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(checkin.check_in(self.subject.pk, self.student.pk, checkin.current_code(self.session)))
+            self.assertFalse(checkin.check_in(self.subject.pk, self.student.pk, checkin.current_code(self.session)))
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_flush_all_writes_indexed_sessions(self):
+        checkin.check_in(self.subject.pk, self.student.pk, checkin.current_code(self.session))
+        self.assertEqual(checkin.open_checkins(), {self.subject.pk})
+        self.assertEqual(checkin.flush_all(), 1)
+        self.assertEqual(Attendance.objects.get(student=self.student).status, 'Present')
+
+    def test_closed_and_reopened_sessions(self):
+        other = Subject.objects.create(title='Networks', code='NET', course=self.subject.course)
+        checkin.open_checkin(other)
+        checkin.flush_checkin(self.subject.pk, final=True)
+        self.assertEqual(checkin.open_checkins(), {other.pk})
+        checkin.open_checkin(self.subject)
+        self.assertEqual(checkin.open_checkins(), {self.subject.pk, other.pk})
+        self.assertEqual(checkin.open_checkins([other.pk]), {other.pk})
@@ -0,0 +1,147 @@
+# core/transcript_pdfs.py
+
+"""
+Bulk transcript PDFs for a course cohort.
+
+All grade data for the cohort is loaded up front in a fixed number of
+queries and flattened into plain dicts. PDFs are then rendered in a process
+pool (the workers never touch the database), or in-process when serving a
+web request, and streamed into a ZIP.
+"""
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .models import Enrollment, StudentCGPA, StudentGPA, StudentGrade, Subject, TranscriptEntry
+from .pdf import MARGIN, PAGE_WIDTH, SimplePDF
+from .streaming import stream_zip
+
+RIGHT = -(PAGE_WIDTH - MARGIN)
+
+
+def collect_transcripts(courses):
+    """
+    Return one plain dict per student enrolled in any of ``courses``, with
+    their complete transcript across every course they are enrolled in.
+    """
+    roster = Enrollment.objects.filter(course__in=courses).values('student_id')
+    enrollments = list(
+        Enrollment.objects.filter(student__in=roster)
+        .select_related('student__user', 'student__university', 'course')
+        .order_by('student__student_id', 'course__title')
+    )
+    cohort_ids = set(roster.values_list('student_id', flat=True))
+    course_ids = {enrollment.course_id for enrollment in enrollments}
+
+    subjects_by_course = defaultdict(list)
+    for subject in Subject.objects.filter(course__in=course_ids).order_by('title'):
+        subjects_by_course[subject.course_id].append(subject)
+    entries = defaultdict(list)
+    for student_id, subject_id, kind, title, score, total in TranscriptEntry.objects.filter(
+        student__in=roster
+    ).order_by('kind', 'title').values_list('student_id', 'subject_id', 'kind', 'title', 'score', 'total_marks'):
+        entries[student_id, subject_id].append((kind.title(), title, score, total))
+    final_grades = {
+        (grade.student_id, grade.subject_id): grade
+        for grade in StudentGrade.objects.filter(student__in=roster)
+    }
+    gpas = {(gpa.student_id, gpa.course_id): gpa for gpa in StudentGPA.objects.filter(student__in=roster)}
+    cgpas = {cgpa.student_id: cgpa for cgpa in StudentCGPA.objects.filter(student__in=roster)}
+
+    generated = timezone.localdate().isoformat()
+    transcripts = {}
+    for enrollment in enrollments:
+        student = enrollment.student
+        if student.pk not in cohort_ids:
+            continue
+        if student.pk not in transcripts:
+            cgpa = cgpas.get(student.pk)
+            transcripts[student.pk] = {
+                'pk': student.pk,
+                'name': student.user.get_full_name() or student.user.username,
+                'student_id': student.student_id,
+                'university': student.university.name,
+                'generated': generated,
+                'cgpa': cgpa and (str(cgpa.cgpa), cgpa.credits, cgpa.rank),
+                'courses': [],
+            }
+        gpa = gpas.get((student.pk, enrollment.course_id))
+        subjects = []
+        for subject in subjects_by_course[enrollment.course_id]:
+            final = final_grades.get((student.pk, subject.pk))
+            subjects.append({
+                'code': subject.code,
+                'title': subject.title,
+                'credits': subject.credits,
+                'grade': final and (final.grade, str(final.points), final.percentage and str(final.percentage)),
+                'entries': entries.get((student.pk, subject.pk), []),
+            })
+        transcripts[student.pk]['courses'].append({
+            'title': enrollment.course.title,
+            'code': enrollment.course.code,
+            'roll_number': enrollment.roll_number,
+            'gpa': gpa and (str(gpa.gpa), gpa.credits, gpa.rank),
+            'subjects': subjects,
+        })
+    return list(transcripts.values())
+
+
+def render_transcript(transcript):
+    """Process pool worker: render one transcript dict to (filename, PDF bytes)."""
+    pdf = SimplePDF()
+    pdf.write_line(transcript['university'], size=16, bold=True)
+    pdf.write_line('Academic Transcript', size=13)
+    pdf.space()
+    pdf.write_columns([('Name', MARGIN), (transcript['name'], MARGIN + 90)])
+    pdf.write_columns([('Student ID', MARGIN), (transcript['student_id'], MARGIN + 90)])
+    if transcript['cgpa']:
+        cgpa, credits, rank = transcript['cgpa']
+        pdf.write_columns([('CGPA', MARGIN), (f'{cgpa} over {credits} credit(s)' + (f', rank {rank}' if rank else ''), MARGIN + 90)])
+    pdf.write_columns([('Issued', MARGIN), (transcript['generated'], MARGIN + 90)])
+
+    for course in transcript['courses']:
+        pdf.space(12)
+        pdf.write_line(f"{course['title']} ({course['code']}) - Roll No. {course['roll_number']}", size=12, bold=True)
+        if course['gpa']:
+            gpa, credits, rank = course['gpa']
+            pdf.write_line(f'GPA {gpa} over {credits} credit(s)' + (f', rank {rank} in course' if rank else ''), size=9)
+        pdf.rule()
+        pdf.write_columns([('Subject', MARGIN), ('Credits', 340), ('%', 410), ('Grade', 450), ('Points', RIGHT)], size=9, bold=True)
+        for subject in course['subjects']:
+            if subject['grade']:
+                grade, points, percentage = subject['grade']
+            else:
+                grade, points, percentage = '-', '-', None
+            pdf.write_columns([
+                (f"{subject['code']}  {subject['title']}"[:55], MARGIN), (subject['credits'], 340),
+                (percentage or '-', 410), (grade, 450), (points, RIGHT),
+            ], bold=True)
+            for kind, title, score, total in subject['entries']:
+                pdf.write_columns([(f'{kind}: {title}'[:70], MARGIN + 15), (f'{score} / {total}', RIGHT)], size=8)
+        pdf.rule()
+
+    # Student IDs are only unique within a university; the pk keeps names apart.
+    filename = get_valid_filename(f"{transcript['pk']}_{transcript['student_id']}.pdf")
+    return filename, pdf.render()
+
+
+def transcript_zip(courses, workers=None):
+    """
+    Generate a ZIP of transcript PDFs for every student in ``courses``,
+    rendered ``workers`` at a time in a process pool. With ``workers=0`` they
+    are rendered one by one in the calling process instead, which is what web
+    requests should use.
+    """
+    transcripts = collect_transcripts(courses)
+    if workers == 0:
+        yield from stream_zip(
+            (filename, ContentFile(data)) for filename, data in map(render_transcript, transcripts)
+        )
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rendered = pool.map(render_transcript, transcripts, chunksize=16)
+        yield from stream_zip((filename, ContentFile(data)) for filename, data in rendered)
@@ -0,0 +1,112 @@
+# core/transcripts.py
+
+"""
+Maintenance of the materialized TranscriptEntry table.
+
+Signals (core/signals.py) keep entries current for individual saves. Bulk
+writes such as bulk_update() send no signals, so code that grades in bulk
+must call refresh_submission_entries() itself.
+"""
+
+from django.db import models, transaction
+
+from .models import Assignment, AssignmentSubmission, Quiz, QuizAttempt, TranscriptEntry
+
+_UPDATE_FIELDS = ['course', 'subject', 'title', 'score', 'total_marks', 'updated_at']
+
+
+def _quiz_totals(quiz_ids):
+    return dict(
+        Quiz.objects.filter(pk__in=quiz_ids).annotate(total=models.Sum('questions__marks')).values_list('pk', 'total')
+    )
+
+
+def refresh_submission_entries(submissions):
+    """Upsert entries for graded submissions and drop them for ungraded ones."""
+    submissions = list(submissions)
+    if not submissions:
+        return
+    assignments = Assignment.objects.select_related('subject').in_bulk(
+        {submission.assignment_id for submission in submissions}
+    )
+    graded, ungraded = [], models.Q()
+    for submission in submissions:
+        if submission.grade is None:
+            ungraded |= models.Q(student_id=submission.student_id, assignment_id=submission.assignment_id)
+            continue
+        assignment = assignments[submission.assignment_id]
+        graded.append(TranscriptEntry(
+            student_id=submission.student_id, course_id=assignment.subject.course_id, subject=assignment.subject,
+            kind='ASSIGNMENT', assignment=assignment, title=assignment.title,
+            score=submission.grade, total_marks=assignment.total_marks,
+        ))
+    with transaction.atomic():
+        TranscriptEntry.objects.bulk_create(
+            graded, update_conflicts=True, unique_fields=['student', 'assignment'], update_fields=_UPDATE_FIELDS,
+        )
+        if ungraded:
+            TranscriptEntry.objects.filter(ungraded).delete()
+
+
+def refresh_attempt_entries(attempts):
+    """Upsert entries for quiz attempts."""
+    attempts = list(attempts)
+    if not attempts:
+        return
+    quiz_ids = {attempt.quiz_id for attempt in attempts}
+    quizzes = Quiz.objects.select_related('subject').in_bulk(quiz_ids)
+    totals = _quiz_totals(quiz_ids)
+    TranscriptEntry.objects.bulk_create([
+        TranscriptEntry(
+            student_id=attempt.student_id, course_id=quizzes[attempt.quiz_id].subject.course_id,
+            subject=quizzes[attempt.quiz_id].subject, kind='QUIZ', quiz=quizzes[attempt.quiz_id],
+            title=quizzes[attempt.quiz_id].title, score=attempt.score, total_marks=totals[attempt.quiz_id] or 0,
+        )
+        for attempt in attempts
+    ], update_conflicts=True, unique_fields=['student', 'quiz'], update_fields=_UPDATE_FIELDS)
+
+
+def refresh_assignment_details(assignment):
+    """Copy an edited assignment's title and total onto its entries."""
+    TranscriptEntry.objects.filter(assignment=assignment).update(
+        title=assignment.title, total_marks=assignment.total_marks,
+    )
+
+
+def refresh_quiz_details(quiz_id):
+    """Copy a quiz's title and current total marks onto its entries."""
+    quiz = Quiz.objects.filter(pk=quiz_id).annotate(total=models.Sum('questions__marks')).first()
+    if quiz is not None:
+        TranscriptEntry.objects.filter(quiz=quiz).update(title=quiz.title, total_marks=quiz.total or 0)
+
+
+def rebuild_transcripts(students=None, batch_size=2000):
+    """
+    Recreate entries from the source tables, optionally for some students only.
+    Returns the number of entries written.
+    """
+    submissions = AssignmentSubmission.objects.filter(grade__isnull=False)
+    attempts = QuizAttempt.objects.all()
+    entries = TranscriptEntry.objects.all()
+    if students is not None:
+        submissions = submissions.filter(student__in=students)
+        attempts = attempts.filter(student__in=students)
+        entries = entries.filter(student__in=students)
+
+    written = 0
+    with transaction.atomic():
+        entries.delete()
+        for queryset, refresh in (
+            (submissions.only('pk', 'assignment_id', 'student_id', 'grade'), refresh_submission_entries),
+            (attempts.only('pk', 'quiz_id', 'student_id', 'score'), refresh_attempt_entries),
+        ):
+            batch = []
+            for row in queryset.iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    refresh(batch)
+                    written += len(batch)
+                    batch = []
+            refresh(batch)
+            written += len(batch)
+    return written
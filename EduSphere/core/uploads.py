@@ -0,0 +1,98 @@
+# core/uploads.py
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+READ_SIZE = 64 * 1024
+
+
+class ChunkedUploadError(Exception):
+    """A chunked upload request that cannot be applied; ``status`` is the HTTP status to return."""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class VerifiedUploadFile(File):
+    """
+    A finished chunked upload whose SHA-256 is already known.
+
+    Like Django's TemporaryUploadedFile it exposes temporary_file_path(), so
+    storages move or link the temp file into place instead of copying it, and
+    ContentAddressedStorage uses ``sha256`` instead of hashing it again.
+    """
+    def __init__(self, path, name, sha256):
+        super().__init__(open(path, 'rb'), name=name)
+        self._path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self._path
+
+
+def append_chunk(upload, stream, offset, length, chunk_sha256=''):
+    """
+    Write ``length`` bytes from ``stream`` at ``offset`` of the upload's temp file.
+
+    Chunks must arrive in order; a client that lost track of its position can
+    ask for the upload status and resume from ``upload.offset``. Anything left
+    over from an interrupted or corrupt chunk is truncated away.
+    """
+    with transaction.atomic():
+        # Locked until the chunk is written, so concurrent requests for the
+        # same offset cannot both pass the check and append twice.
+        upload.refresh_from_db(fields=['offset'], from_queryset=type(upload).objects.select_for_update())
+        _write_chunk(upload, stream, offset, length, chunk_sha256)
+
+
+def _write_chunk(upload, stream, offset, length, chunk_sha256):
+    if offset != upload.offset:
+        raise ChunkedUploadError(f'Expected offset {upload.offset}, got {offset}.', status=409)
+    if length <= 0 or length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        raise ChunkedUploadError(f'Chunks must be between 1 and {settings.CHUNKED_UPLOAD_CHUNK_SIZE} bytes.')
+    if offset + length > upload.size:
+        raise ChunkedUploadError('Chunk extends past the declared file size.')
+
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    sha256 = hashlib.sha256()
+    mode = 'r+b' if os.path.exists(upload.temp_path) else 'wb'
+    with open(upload.temp_path, mode) as f:
+        f.seek(offset)
+        f.truncate()
+        remaining = length
+        while remaining:
+            data = stream.read(min(READ_SIZE, remaining))
+            if not data:
+                break
+            sha256.update(data)
+            f.write(data)
+            remaining -= len(data)
+        if remaining or (chunk_sha256 and sha256.hexdigest() != chunk_sha256.lower()):
+            f.truncate(offset)
+            raise ChunkedUploadError('Chunk was incomplete or failed its checksum; please resend it.')
+
+    upload.offset = offset + length
+    upload.save(update_fields=['offset'])
+
+
+def finish_upload(upload):
+    """
+    Verify a completed upload and return it as a VerifiedUploadFile.
+
+    This is the only full pass over the assembled file; the digest it computes
+    is passed on so storage does not need to read the file again.
+    """
+    if not upload.is_complete:
+        raise ChunkedUploadError(f'Upload is incomplete ({upload.offset} of {upload.size} bytes).', status=409)
+    sha256 = hashlib.sha256()
+    with open(upload.temp_path, 'rb') as f:
+        for data in iter(lambda: f.read(READ_SIZE * 16), b''):
+            sha256.update(data)
+    digest = sha256.hexdigest()
+    if upload.sha256 and digest != upload.sha256.lower():
+        raise ChunkedUploadError('The assembled file does not match its checksum.', status=422)
+    return VerifiedUploadFile(upload.temp_path, upload.filename, digest)
@@ -33,9 +33,12 @@ urlpatterns = [
     path('courses/<int:pk>/update/', views.CourseUpdateView.as_view(), name='course_update'),
     path('courses/<int:pk>/delete/', views.CourseDeleteView.as_view(), name='course_delete'),
     path('courses/<int:pk>/', views.CourseDetailView.as_view(), name='course_detail'), # New
+    path('courses/<int:pk>/gradebook/', views.CourseGradebookView.as_view(), name='course_gradebook'),
     path('courses/<int:course_pk>/subjects/create/', views.SubjectCreateView.as_view(), name='subject_create'), # New
     path('subjects/<int:pk>/update/', views.SubjectUpdateView.as_view(), name='subject_update'),
     path('subjects/<int:pk>/delete/', views.SubjectDeleteView.as_view(), name='subject_delete'),
+    path('lookups/students/', views.StudentLookupView.as_view(), name='student_lookup'),
+    path('lookups/faculty/', views.FacultyLookupView.as_view(), name='faculty_lookup'),
     path('courses/<int:course_pk>/enroll/', views.EnrollStudentView.as_view(), name='enroll_student'), # New
     path('unenroll/<int:pk>/', views.UnenrollStudentView.as_view(), name='unenroll_student'), 
     path('courses/<int:course_pk>/bulk-enroll/', views.StudentBulkEnrollmentView.as_view(), name='student_bulk_enroll'), # New URL
@@ -43,13 +46,22 @@ urlpatterns = [
     
     path('student/courses/', views.StudentCourseListView.as_view(), name='student_course_list'),
     path('student/courses/<int:pk>/', views.StudentCourseDetailView.as_view(), name='student_course_detail'),
+    path('student/subjects/<int:pk>/panel/', views.StudentSubjectPanelView.as_view(), name='student_subject_panel'),
     path('student/assignments/<int:pk>/', views.StudentAssignmentDetailView.as_view(), name='student_assignment_detail'),
 
     path('faculty/subjects/', views.FacultySubjectListView.as_view(), name='faculty_subject_list'),
     path('faculty/subjects/<int:pk>/', views.FacultySubjectDetailView.as_view(), name='faculty_subject_detail'),
+    path('faculty/subjects/<int:pk>/<str:section>/panel/', views.FacultySubjectSectionView.as_view(), name='faculty_subject_section'),
+    path('faculty/subjects/<int:pk>/gradebook/', views.SubjectGradebookView.as_view(), name='subject_gradebook'),
+    path('faculty/subjects/<int:pk>/gradebook.csv', views.SubjectGradebookExportView.as_view(), name='subject_gradebook_export'),
+    path('subjects/<int:pk>/grading/', views.GradingSchemeView.as_view(), name='grading_scheme'),
+    path('faculty/subjects/<int:pk>/attendance/', views.TakeAttendanceView.as_view(), name='take_attendance'),
+    path('faculty/subjects/<int:pk>/checkin/', views.SelfCheckInView.as_view(), name='self_checkin'),
+    path('faculty/subjects/<int:pk>/checkin/status/', views.SelfCheckInStatusView.as_view(), name='self_checkin_status'),
     path('faculty/subjects/<int:subject_pk>/resources/create/', views.ResourceCreateView.as_view(), name='resource_create'),
     path('student/transcript/', views.StudentTranscriptView.as_view(), name='student_transcript'),
     path('student/profile/', views.StudentProfileView.as_view(), name='student_profile'),
+    path('student/checkin/', views.StudentCheckInView.as_view(), name='student_checkin'),
 
     # --- NEW STUDENT QUIZ URLs ---
     path('student/quizzes/<int:pk>/take/', views.TakeQuizView.as_view(), name='take_quiz'),
@@ -60,6 +72,8 @@ urlpatterns = [
     path('assignments/<int:pk>/update/', views.AssignmentUpdateView.as_view(), name='assignment_update'),
     path('assignments/<int:pk>/delete/', views.AssignmentDeleteView.as_view(), name='assignment_delete'),
     path('assignments/<int:pk>/submissions/', views.SubmissionListView.as_view(), name='view_submissions'),
+    path('assignments/<int:pk>/submissions/import/', views.SubmissionGradeImportView.as_view(), name='import_grades'),
+    path('assignments/<int:pk>/submissions/download/', views.SubmissionDownloadView.as_view(), name='download_submissions'),
     path('submissions/<int:pk>/grade/', views.GradeSubmissionView.as_view(), name='grade_submission'),
     # --- NEW QUIZ URLs ---
     path('subjects/<int:subject_pk>/quizzes/create/', views.QuizCreateView.as_view(), name='quiz_create'),
@@ -69,4 +83,13 @@ urlpatterns = [
     path('quizzes/<int:quiz_pk>/questions/add/', views.QuestionCreateView.as_view(), name='question_create'),
     path('quizzes/<int:pk>/attempts/', views.QuizAttemptsListView.as_view(), name='quiz_attempts_list'),
     path('quiz_attempt/<int:pk>/grade/', views.GradeQuizAttemptView.as_view(), name='grade_quiz_attempt'),
+
+    # --- RESUMABLE UPLOADS ---
+    path('uploads/', views.ChunkedUploadInitView.as_view(), name='chunked_upload_init'),
+    path('uploads/<uuid:upload_id>/', views.ChunkedUploadChunkView.as_view(), name='chunked_upload_chunk'),
+    path('uploads/<uuid:upload_id>/finalize/', views.ChunkedUploadFinalizeView.as_view(), name='chunked_upload_finalize'),
+
+    # --- PROTECTED FILE DOWNLOADS ---
+    path('files/resources/<int:pk>/', views.ResourceFileView.as_view(), name='resource_file'),
+    path('files/submissions/<int:pk>/', views.SubmissionFileView.as_view(), name='submission_file'),
 ]
@@ -1,22 +1,43 @@
 # core/views.py
 
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect,render,get_object_or_404
 from django.views.generic import FormView,TemplateView
-from django.urls import reverse_lazy # Use reverse_lazy for class attributes
+from django.urls import reverse, reverse_lazy # Use reverse_lazy for class attributes
 from django.views.generic.edit import CreateView, UpdateView , DeleteView, FormMixin # Import editing views
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import TemplateView, ListView, DetailView # Add DetailView
-from .models import Course, Department, Subject, Student,Faculty, Enrollment, LearningResource,Assignment,Notification,AssignmentSubmission,Quiz,Question,MCQOption,QuizAttempt,StudentAnswer
-from .forms import FileUploadForm,AssignmentSubmissionForm,FacultyRegistrationForm,GradingForm,QuestionForm,MCQOptionFormSet,AssignmentForm,QuizForm,DepartmentForm,StudentRegistrationForm, SubjectForm
+from .models import Course, Department, Subject, Student,Faculty, Enrollment, LearningResource,Assignment,Notification,AssignmentSubmission,Quiz,Question,MCQOption,QuizAttempt,StudentAnswer,ChunkedUpload,StudentCGPA,Attendance
+from .forms import AttendanceDateForm,EnrollmentForm,FileUploadForm,AssignmentSubmissionForm,FacultyRegistrationForm,GradingForm,GradingFormSet,GradingSchemeForm,QuestionForm,MCQOptionFormSet,AssignmentForm,QuizForm,DepartmentForm,StudentRegistrationForm, SubjectForm
 from django import forms
 from django.forms import modelformset_factory
 from django.views import View
 from django.contrib import messages
-from django.db import models,transaction
+from django.db import IntegrityError,models,transaction
 from django.contrib.auth.models import User 
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.text import get_valid_filename
+from .stats import quiz_score_summary, invalidate_quiz_score_summary
+from .attendance import record_session, student_attendance, subject_attendance_summary
+from .checkin import CheckInError, check_in, checked_in, current_code, flush_checkin, get_session, open_checkin, open_checkins, seconds_until_rotation
+from .course_content import COURSE_FRAGMENT_TIMEOUT, attempted_quiz_pks, course_version
+from .downloads import serve_file
+from .gradebook import build_gradebook, stream_gradebook_csv
+from .grading import compute_final_grades, get_scheme, publish_final_grades
+from .lookups import enrollable_students, hod_candidates, lookup_page, subject_faculty_candidates
+from .pagination import keyset_page, parse_cursor
+from .similarity import similarity_clusters
+from .streaming import stream_zip
+from .transcripts import refresh_submission_entries
+from .uploads import ChunkedUploadError, append_chunk, finish_upload
 import csv
 import io
+import os
+import time
+from itertools import groupby
 
 
 class UniversityAdminRequiredMixin(UserPassesTestMixin):
@@ -303,9 +324,8 @@ class CourseUpdateView(LoginRequiredMixin, HODRequiredMixin, UpdateView):
         hods_department = Department.objects.get(hod=self.request.user.faculty)
         return Course.objects.filter(department=hods_department)
     
-class CourseDetailView(LoginRequiredMixin, HODRequiredMixin, DetailView):
+class HODCourseMixin(LoginRequiredMixin, HODRequiredMixin):
     model = Course
-    template_name = 'core/course_detail.html'
     context_object_name = 'course'
 
     def get_queryset(self):
@@ -313,6 +333,63 @@ class CourseDetailView(LoginRequiredMixin, HODRequiredMixin, DetailView):
         hods_department = Department.objects.get(hod=self.request.user.faculty)
         return Course.objects.filter(department=hods_department)
 
+class CourseDetailView(HODCourseMixin, DetailView):
+    template_name = 'core/course_detail.html'
+    roster_page_size = 50
+
+    def get_roster(self):
+        """Enrollments matching ?q (every word must match a name, username, student ID or roll number)."""
+        roster = Enrollment.objects.filter(course=self.object).select_related('student__user')
+        for term in self.request.GET.get('q', '').split():
+            roster = roster.filter(
+                models.Q(student__user__first_name__icontains=term) | models.Q(student__user__last_name__icontains=term)
+                | models.Q(student__user__username__icontains=term) | models.Q(student__student_id__icontains=term)
+                | models.Q(roll_number__icontains=term)
+            )
+        return roster
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        enrollments, previous_cursor, next_cursor = keyset_page(
+            self.get_roster(),
+            after=parse_cursor(self.request.GET.get('after')),
+            before=parse_cursor(self.request.GET.get('before')),
+            size=self.roster_page_size,
+        )
+        context.update({
+            'subjects': self.object.subjects.prefetch_related(
+                models.Prefetch('faculty', queryset=Faculty.objects.select_related('user'))
+            ),
+            'enrollments': enrollments,
+            'previous_cursor': previous_cursor,
+            'next_cursor': next_cursor,
+            'query': self.request.GET.get('q', ''),
+        })
+        return context
+
+class GradebookMixin:
+    """Students x assessments grid for the (course, subjects) pair returned by get_gradebook_scope()."""
+    template_name = 'core/gradebook.html'
+    paginate_by = 50
+
+    def get_gradebook_scope(self):
+        """Return (course, subjects) whose assessments make up the columns."""
+        raise NotImplementedError
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        gradebook = build_gradebook(*self.get_gradebook_scope())
+        page = Paginator(gradebook['rows'], self.paginate_by).get_page(self.request.GET.get('page'))
+        context['gradebook'] = gradebook
+        context['page_obj'] = page
+        context['rows'] = page.object_list
+        context['show_subject'] = len({column['subject'].pk for column in gradebook['columns']}) > 1
+        return context
+
+class CourseGradebookView(GradebookMixin, HODCourseMixin, DetailView):
+    def get_gradebook_scope(self):
+        return self.object, self.object.subjects.all()
+
 class CourseDeleteView(LoginRequiredMixin, HODRequiredMixin, DeleteView):
     model = Course
     template_name = 'core/course_confirm_delete.html'
@@ -379,42 +456,86 @@ class SubjectDeleteView(LoginRequiredMixin, HODRequiredMixin, DeleteView):
 
 class EnrollStudentView(LoginRequiredMixin, HODRequiredMixin, CreateView):
     model = Enrollment
-    fields = ['student', 'roll_number']
+    form_class = EnrollmentForm
     template_name = 'core/enrollment_form.html'
 
+    @cached_property
+    def course(self):
+        # Only courses in the HOD's own department
+        return get_object_or_404(Course, pk=self.kwargs['course_pk'], department__hod=self.request.user.faculty)
+
     def get_context_data(self, **kwargs):
         # Pass the course to the template
         context = super().get_context_data(**kwargs)
-        context['course'] = Course.objects.get(pk=self.kwargs['course_pk'])
+        context['course'] = self.course
         return context
 
-    def get_form(self, form_class=None):
-        form = super().get_form(form_class)
-        # Filter the 'student' dropdown
-        course_pk = self.kwargs['course_pk']
-        hods_department = Department.objects.get(hod=self.request.user.faculty)
-        
-        # Get primary keys of students already enrolled in this course
-        enrolled_student_pks = Enrollment.objects.filter(course__pk=course_pk).values_list('student__pk', flat=True)
-        
-        # Filter queryset to students in the same university, excluding those already enrolled
-        form.fields['student'].queryset = Student.objects.filter(
-            university=hods_department.university
-        ).exclude(
-            pk__in=enrolled_student_pks
-        )
-        return form
+    def get_form_kwargs(self):
+        # The student picker searches this course's university, excluding students already enrolled
+        kwargs = super().get_form_kwargs()
+        kwargs['course'] = self.course
+        return kwargs
 
     def form_valid(self, form):
         # Assign the enrollment to the correct course from the URL
-        course = Course.objects.get(pk=self.kwargs['course_pk'])
-        form.instance.course = course
+        form.instance.course = self.course
         return super().form_valid(form)
 
     def get_success_url(self):
         # Redirect back to the course detail page
         return reverse_lazy('core:course_detail', kwargs={'pk': self.kwargs['course_pk']})
 
+class LookupView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    JSON search behind the remote select2 pickers: one page of prefix
+    matches on ?q, limited to the requesting HOD's or admin's university.
+    """
+    id_field = None
+
+    def test_func(self):
+        user = self.request.user
+        return hasattr(user, 'universityadmin') or (
+            hasattr(user, 'faculty') and Department.objects.filter(hod=user.faculty).exists()
+        )
+
+    def get_university(self):
+        user = self.request.user
+        return user.universityadmin.university if hasattr(user, 'universityadmin') else user.faculty.university
+
+    def get_choices(self, university):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        try:
+            page = max(int(request.GET.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+        choices = self.get_choices(self.get_university())
+        return JsonResponse(lookup_page(choices, request.GET.get('q', ''), self.id_field, page))
+
+class StudentLookupView(LookupView):
+    """Students; ?course=<pk> leaves out those already enrolled in that course."""
+    id_field = 'student_id'
+
+    def get_choices(self, university):
+        course = None
+        course_pk = self.request.GET.get('course', '')
+        if course_pk:
+            course = get_object_or_404(Course, pk=course_pk if course_pk.isdigit() else None, university=university)
+        return enrollable_students(university, course)
+
+class FacultyLookupView(LookupView):
+    """Faculty; ?exclude=teaching leaves out faculty teaching a subject, ?exclude=hods leaves out HODs."""
+    id_field = 'employee_id'
+
+    def get_choices(self, university):
+        exclude = self.request.GET.get('exclude')
+        if exclude == 'teaching':
+            return hod_candidates(university)
+        if exclude == 'hods':
+            return subject_faculty_candidates(university)
+        return Faculty.objects.filter(university=university)
+
 class StudentBulkEnrollmentView(LoginRequiredMixin, HODRequiredMixin, View):
     template_name = 'core/student_bulk_enroll.html'
 
@@ -521,6 +642,37 @@ class StudentCourseDetailView(LoginRequiredMixin, StudentRequiredMixin, DetailVi
         """
         return self.request.user.student.enrolled_courses.all()
 
+    def get_context_data(self, **kwargs):
+        # Only the subject headers; each panel is fetched from StudentSubjectPanelView when opened.
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'subjects': self.object.subjects.order_by('pk'),
+            'course_version': course_version(self.object.pk),
+            'fragment_timeout': COURSE_FRAGMENT_TIMEOUT,
+        })
+        return context
+
+class StudentSubjectPanelView(LoginRequiredMixin, StudentRequiredMixin, DetailView):
+    """One subject's resources, assignments and quizzes, rendered as a course page panel."""
+    model = Subject
+    template_name = 'core/student_subject_panel.html'
+    context_object_name = 'subject'
+
+    def get_queryset(self):
+        return Subject.objects.filter(course__in=self.request.user.student.enrolled_courses.all())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        attempted = attempted_quiz_pks(self.request.user.student, self.object)
+        context.update({
+            'attempted_quiz_pks': attempted,
+            # Students who attempted the same quizzes share a rendered panel.
+            'attempted_key': ','.join(map(str, sorted(attempted))),
+            'course_version': course_version(self.object.course_id),
+            'fragment_timeout': COURSE_FRAGMENT_TIMEOUT,
+        })
+        return context
+
 class StudentProfileView(LoginRequiredMixin, StudentRequiredMixin, TemplateView):
     template_name = 'core/student_profile.html'
 
@@ -529,6 +681,8 @@ class StudentProfileView(LoginRequiredMixin, StudentRequiredMixin, TemplateView)
         # We get the student profile directly from the logged-in user.
         context = super().get_context_data(**kwargs)
         context['student_profile'] = self.request.user.student
+        context['attendance'] = student_attendance(self.request.user.student)
+        context['attendance_threshold'] = settings.ATTENDANCE_LOW_THRESHOLD
         return context
 
 class StudentTranscriptView(LoginRequiredMixin, StudentRequiredMixin, TemplateView):
@@ -538,45 +692,58 @@ class StudentTranscriptView(LoginRequiredMixin, StudentRequiredMixin, TemplateVi
         context = super().get_context_data(**kwargs)
         student = self.request.user.student
 
-        # Get all courses the student is enrolled in
-        enrolled_courses = student.enrolled_courses.prefetch_related(
-            'subjects__assignments__submissions',
-            'subjects__quizzes__attempts'
-        ).all()
+        # One query over the materialized entries, grouped by course then subject.
+        entries = student.transcript_entries.filter(
+            course__in=student.enrolled_courses.all()
+        ).select_related('course', 'subject').order_by(
+            'course__title', 'course_id', 'subject__title', 'subject_id', 'kind', 'title'
+        )
 
         transcript_data = []
-        for course in enrolled_courses:
-            course_data = {
+        for course, course_entries in groupby(entries, key=lambda entry: entry.course):
+            transcript_data.append({
                 'course': course,
-                'subjects': []
-            }
-            for subject in course.subjects.all():
-                # Get graded assignments for this student in this subject
-                assignments = AssignmentSubmission.objects.filter(
-                    assignment__subject=subject,
-                    student=student,
-                    grade__isnull=False # Only show graded assignments
-                )
-                
-                # Get quiz attempts for this student in this subject
-                quizzes = QuizAttempt.objects.filter(
-                    quiz__subject=subject,
-                    student=student
-                )
-
-                if assignments.exists() or quizzes.exists():
-                    course_data['subjects'].append({
-                        'subject': subject,
-                        'assignments': assignments,
-                        'quizzes': quizzes,
-                    })
-            
-            if course_data['subjects']:
-                transcript_data.append(course_data)
+                'subjects': [
+                    {'subject': subject, 'entries': list(subject_entries)}
+                    for subject, subject_entries in groupby(course_entries, key=lambda entry: entry.subject)
+                ],
+            })
         
+        gpas = {gpa.course_id: gpa for gpa in student.course_gpas.all()}
+        for course_data in transcript_data:
+            course_data['gpa'] = gpas.get(course_data['course'].pk)
+
         context['transcript_data'] = transcript_data
+        context['cgpa'] = StudentCGPA.objects.filter(student=student).first()
         return context
     
+class StudentCheckInView(LoginRequiredMixin, StudentRequiredMixin, TemplateView):
+    """Students check in to a lecture with the code shown in class."""
+    template_name = 'core/student_checkin.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        subjects = Subject.objects.filter(course__in=self.request.user.student.enrolled_courses.all())
+        context['open_subjects'] = subjects.filter(
+            pk__in=open_checkins(subjects.values_list('pk', flat=True))
+        ).select_related('course')
+        return context
+
+    def post(self, request, *args, **kwargs):
+        try:
+            subject_pk = int(request.POST.get('subject', ''))
+            added = check_in(subject_pk, request.user.student.pk, request.POST.get('code', ''))
+        except ValueError:
+            messages.error(request, "Please choose a lecture.")
+        except CheckInError as e:
+            messages.error(request, str(e))
+        else:
+            if added:
+                messages.success(request, "You are checked in.")
+            else:
+                messages.info(request, "You have already checked in to this lecture.")
+        return redirect('core:student_checkin')
+
 class StudentAssignmentDetailView(LoginRequiredMixin, StudentRequiredMixin, FormMixin, DetailView):
     model = Assignment
     form_class = AssignmentSubmissionForm
@@ -599,6 +766,7 @@ class StudentAssignmentDetailView(LoginRequiredMixin, StudentRequiredMixin, Form
         # Only add the form if there is no existing submission
         if not existing_submission:
             context['form'] = self.get_form()
+            context['chunked_upload_chunk_size'] = settings.CHUNKED_UPLOAD_CHUNK_SIZE
         return context
 
     def post(self, request, *args, **kwargs):
@@ -673,26 +841,37 @@ class TakeQuizView(LoginRequiredMixin, StudentRequiredMixin, FormView):
         quiz = self.get_quiz()
         student = self.request.user.student
         
-        # Create the main quiz attempt record
-        attempt = QuizAttempt.objects.create(quiz=quiz, student=student, score=0)
-        
-        current_score = 0
-        for name, value in form.cleaned_data.items():
-            question_id = int(name.split('_')[1])
-            question = Question.objects.get(id=question_id)
-            
-            answer = StudentAnswer(quiz_attempt=attempt, question=question)
-            if question.question_type == 'MCQ':
-                selected_option = value
-                answer.mcq_option = selected_option
-                if selected_option.is_correct:
-                    current_score += question.marks
-            else: # Descriptive
-                answer.descriptive_answer = value
-            answer.save()
-            
-        attempt.score = current_score
-        attempt.save()
+        pack_mcq = getattr(settings, 'PACK_MCQ_ANSWERS', False)
+        questions = quiz.questions.in_bulk()
+
+        with transaction.atomic():
+            # Create the main quiz attempt record
+            attempt = QuizAttempt.objects.create(quiz=quiz, student=student, score=0)
+
+            current_score = 0
+            answers = []
+            selected_options = []
+            for name, value in form.cleaned_data.items():
+                question_id = int(name.split('_')[1])
+                question = questions[question_id]
+
+                if question.question_type == 'MCQ':
+                    selected_option = value
+                    if selected_option.is_correct:
+                        current_score += question.marks
+                    if pack_mcq:
+                        selected_options.append(selected_option)
+                        continue
+                    answers.append(StudentAnswer(quiz_attempt=attempt, question=question, mcq_option=selected_option))
+                else: # Descriptive
+                    answers.append(StudentAnswer(quiz_attempt=attempt, question=question, descriptive_answer=value))
+            StudentAnswer.objects.bulk_create(answers)
+
+            attempt.score = current_score
+            if selected_options:
+                attempt.pack_mcq_choices(selected_options)
+            attempt.save()
+        invalidate_quiz_score_summary(quiz.pk)
         
         # Store attempt pk in session to pass to success_url
         self.request.session['quiz_attempt_pk'] = attempt.pk
@@ -745,6 +924,180 @@ class FacultySubjectDetailView(LoginRequiredMixin, FacultyRequiredMixin, DetailV
         """
         return self.request.user.faculty.subjects_taught.all()
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # (section, heading, create URL, create button); each section is loaded by FacultySubjectSectionView.
+        context['sections'] = [
+            ('resources', 'Learning Resources', reverse('core:resource_create', args=[self.object.pk]), 'Upload New Resource'),
+            ('assignments', 'Assignments', reverse('core:assignment_create', args=[self.object.pk]), 'Create New Assignment'),
+            ('quizzes', 'Quizzes', reverse('core:quiz_create', args=[self.object.pk]), 'Create New Quiz'),
+        ]
+        return context
+
+class FacultySubjectSectionView(FacultySubjectDetailView):
+    """One section (resources, assignments or quizzes) of the subject page, loaded when it is opened."""
+    template_name = 'core/faculty_subject_section.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        section = self.kwargs['section']
+        if section == 'resources':
+            items = self.object.resources.all()
+        elif section == 'assignments':
+            items = self.object.assignments.all()
+        elif section == 'quizzes':
+            items = self.object.quizzes.all()
+        else:
+            raise Http404("Unknown section.")
+        context.update({'section': section, 'items': items})
+        return context
+
+class SubjectGradebookExportView(FacultySubjectDetailView):
+    """Stream the subject's gradebook as CSV: one row per enrolled student, one column per assessment."""
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        response = StreamingHttpResponse(stream_gradebook_csv(self.object), content_type='text/csv')
+        filename = get_valid_filename(f'{self.object.code}-gradebook.csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class SubjectGradebookView(GradebookMixin, FacultySubjectDetailView):
+    def get_gradebook_scope(self):
+        return self.object.course, [self.object]
+
+class TakeAttendanceView(LoginRequiredMixin, FacultyRequiredMixin, DetailView):
+    """
+    Mark a whole lecture at once: every enrolled student is listed with a
+    'present' checkbox and their attendance so far, and the session is
+    written with one upsert of rows and one of bitmaps.
+    """
+    model = Subject
+    template_name = 'core/take_attendance.html'
+    context_object_name = 'subject'
+
+    def get_queryset(self):
+        return self.request.user.faculty.subjects_taught.select_related('course')
+
+    def get_roster(self):
+        return Enrollment.objects.filter(course=self.object.course).select_related('student__user').order_by(
+            'student__user__last_name', 'student__user__first_name', 'student_id'
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = kwargs.get('date_form') or AttendanceDateForm(self.request.GET or {'date': timezone.localdate()})
+        date = form.cleaned_data['date'] if form.is_valid() else timezone.localdate()
+        statuses = dict(
+            Attendance.objects.filter(subject=self.object, date=date).values_list('student_id', 'status')
+        )
+        context['date_form'] = form
+        context['date'] = date
+        context['already_taken'] = bool(statuses)
+        summary = subject_attendance_summary(self.object)
+        context['summary'] = summary
+        context['rows'] = [
+            # Students default to present until the session has been saved.
+            (enrollment, statuses.get(enrollment.student_id, 'Present'), summary['students'].get(enrollment.student_id))
+            for enrollment in self.get_roster()
+        ]
+        return context
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        form = AttendanceDateForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, "Please choose a valid date.")
+            return self.render_to_response(self.get_context_data(date_form=form))
+        date = form.cleaned_data['date']
+        present = set(request.POST.getlist('present'))
+
+        statuses = {
+            student_id: 'Present' if str(student_id) in present else 'Absent'
+            for student_id in self.get_roster().values_list('student_id', flat=True)
+        }
+        record_session(self.object, date, statuses)
+        present_count = sum(status == 'Present' for status in statuses.values())
+        messages.success(request, f"Attendance saved for {date:%d %b %Y}: {present_count} of {len(statuses)} present.")
+        return redirect(f"{reverse('core:take_attendance', kwargs={'pk': self.object.pk})}?date={date.isoformat()}")
+
+class SelfCheckInView(FacultySubjectDetailView):
+    """Open or close a lecture's self check-in and display its rotating code."""
+    template_name = 'core/self_checkin.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['session'] = get_session(self.object.pk)
+        context['code_period'] = settings.CHECKIN_CODE_PERIOD
+        return context
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if request.POST.get('action') == 'close':
+            written = flush_checkin(self.object.pk, final=True)
+            messages.success(request, f"Check-in closed. {written} attendance record(s) written.")
+            return redirect('core:take_attendance', pk=self.object.pk)
+        open_checkin(self.object)
+        messages.success(request, "Self check-in is open. Show the code to the class.")
+        return redirect('core:self_checkin', pk=self.object.pk)
+
+class SelfCheckInStatusView(FacultySubjectDetailView):
+    """JSON polled by the check-in page: the current code and how many students have checked in."""
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        session = get_session(self.object.pk)
+        if session is None:
+            return JsonResponse({'open': False})
+        now = time.time()
+        return JsonResponse({
+            'open': now <= session['expires_at'],
+            'code': current_code(session),
+            'rotates_in': seconds_until_rotation(),
+            'closes_in': max(int(session['expires_at'] - now), 0),
+            'checked_in': len(checked_in(session)),
+        })
+
+class GradingSchemeView(LoginRequiredMixin, FacultyRequiredMixin, UpdateView):
+    """
+    Edit a subject's grading scheme, preview the resulting final grades and
+    publish them to StudentGrade. Open to the subject's faculty and the HOD.
+    """
+    form_class = GradingSchemeForm
+    template_name = 'core/grading_scheme.html'
+    context_object_name = 'scheme'
+
+    def get_subject(self):
+        faculty = self.request.user.faculty
+        subjects = Subject.objects.filter(
+            models.Q(faculty=faculty) | models.Q(course__department__hod=faculty)
+        ).select_related('course').distinct()
+        return get_object_or_404(subjects, pk=self.kwargs['pk'])
+
+    def get_object(self, queryset=None):
+        self.subject = self.get_subject()
+        return get_scheme(self.subject)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['subject'] = self.subject
+        context['preview'] = compute_final_grades(self.subject, self.object)
+        context['published_count'] = self.subject.grades.count()
+        if self.subject.faculty.filter(pk=self.request.user.faculty.pk).exists():
+            context['back_url'] = reverse('core:faculty_subject_detail', kwargs={'pk': self.subject.pk})
+        else:
+            context['back_url'] = reverse('core:course_detail', kwargs={'pk': self.subject.course.pk})
+        return context
+
+    def form_valid(self, form):
+        self.object = form.save()
+        if 'publish' in self.request.POST:
+            results = publish_final_grades(self.subject, self.object)
+            messages.success(self.request, f"Published final grades for {len(results)} student(s).")
+        else:
+            messages.success(self.request, "Grading scheme saved.")
+        return redirect('core:grading_scheme', pk=self.subject.pk)
+
 class ResourceCreateView(LoginRequiredMixin, FacultyRequiredMixin, CreateView):
     model = LearningResource
     fields = ['title', 'description', 'file', 'link']
@@ -754,6 +1107,7 @@ class ResourceCreateView(LoginRequiredMixin, FacultyRequiredMixin, CreateView):
         # Pass the subject to the template for context
         context = super().get_context_data(**kwargs)
         context['subject'] = Subject.objects.get(pk=self.kwargs['subject_pk'])
+        context['chunked_upload_chunk_size'] = settings.CHUNKED_UPLOAD_CHUNK_SIZE
         return context
 
     def form_valid(self, form):
@@ -826,6 +1180,13 @@ class AssignmentDeleteView(LoginRequiredMixin, FacultyRequiredMixin, DeleteView)
     def get_success_url(self):
         return reverse_lazy('core:faculty_subject_detail', kwargs={'pk': self.object.subject.pk})
 
+def grade_notification(submission):
+    """Unsaved notification telling a student their submission was graded."""
+    return Notification(
+        recipient=submission.student.user,
+        message=f"Your submission for '{submission.assignment.title}' has been graded. You received {submission.grade}."
+    )
+
 class SubmissionListView(LoginRequiredMixin, FacultyRequiredMixin, DetailView):
     model = Assignment
     template_name = 'core/submission_list.html'
@@ -835,39 +1196,189 @@ class SubmissionListView(LoginRequiredMixin, FacultyRequiredMixin, DetailView):
         """Security: Ensure faculty can only view submissions for their own assignments."""
         return Assignment.objects.filter(subject__faculty=self.request.user.faculty)
 
+    # Each submission posts about three fields, so a page stays well under
+    # DATA_UPLOAD_MAX_NUMBER_FIELDS (1000) however many were handed in.
+    grading_page_size = 100
+
+    def get_submissions(self):
+        return self.object.submissions.select_related('student__user', 'assignment')
+
+    @cached_property
+    def grading_page(self):
+        return keyset_page(
+            self.get_submissions(),
+            after=parse_cursor(self.request.GET.get('after')),
+            before=parse_cursor(self.request.GET.get('before')),
+            size=self.grading_page_size,
+        )
+
+    def get_formset(self, data=None):
+        if data is None:
+            submissions, _, _ = self.grading_page
+            return GradingFormSet(queryset=self.get_submissions().filter(pk__in=[sub.pk for sub in submissions]).order_by('pk'))
+        # Bound to the submissions that were posted, so submissions handed in
+        # since the page was rendered cannot shift it.
+        posted = [
+            value for key, value in data.items()
+            if key.startswith('form-') and key.endswith('-id') and value.isdigit()
+        ]
+        return GradingFormSet(
+            data, queryset=self.get_submissions().filter(pk__in=posted[:self.grading_page_size]).order_by('pk')
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        submissions = self.object.submissions.all().order_by('student__user__last_name')
-        
-        # Create a list of tuples, each containing a submission and its grading form
-        submission_forms = []
-        for sub in submissions:
-            submission_forms.append((sub, GradingForm(instance=sub)))
-        
-        context['submission_forms'] = submission_forms
+        context.setdefault('formset', self.get_formset())
+        _, context['previous_cursor'], context['next_cursor'] = self.grading_page
+        context['similarity_clusters'] = similarity_clusters(self.object)
+        # Rows skipped by the last CSV import, shown once after its redirect.
+        context['import_errors'] = self.request.session.pop(self.import_errors_key(), None)
         return context
 
+    def import_errors_key(self):
+        return f'grade_import_errors:{self.object.pk}'
+
+
+    def post(self, request, *args, **kwargs):
+        """Bulk grading: save every changed grade in one transaction and redirect once."""
+        self.object = self.get_object()
+        formset = self.get_formset(request.POST)
+        if not formset.is_valid():
+            messages.error(request, "Some grades could not be saved. Please correct the errors below.")
+            return self.render_to_response(self.get_context_data(formset=formset))
+
+        # save(commit=False) only returns submissions whose fields changed.
+        changed = formset.save(commit=False)
+        newly_graded = [
+            form.instance for form in formset.forms
+            if 'grade' in form.changed_data and form.instance.grade is not None
+        ]
+        self.save_grades(changed, newly_graded)
+
+        messages.success(request, f"Saved {len(changed)} grade(s) and notified {len(newly_graded)} student(s).")
+        # Back to the same page of submissions.
+        return redirect(request.get_full_path())
+
+    def save_grades(self, changed, newly_graded):
+        """Write graded submissions and their notifications in one transaction."""
+        with transaction.atomic():
+            AssignmentSubmission.objects.bulk_update(changed, ['grade', 'feedback'])
+            # bulk_update() sends no post_save, so refresh the transcript here.
+            refresh_submission_entries(changed)
+            Notification.objects.bulk_create([grade_notification(sub) for sub in newly_graded])
+
+class SubmissionDownloadView(SubmissionListView):
+    """Stream every submission for an assignment as one ZIP, named by student ID."""
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        submissions = self.object.submissions.select_related('student').order_by('student__student_id')
+        entries = (
+            (get_valid_filename(sub.student.student_id) + os.path.splitext(sub.submitted_file.name)[1], sub.submitted_file)
+            for sub in submissions.iterator()
+        )
+        response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+        filename = get_valid_filename(f'{self.object.title}-submissions.zip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class SubmissionGradeImportView(SubmissionListView):
+    """
+    Import grades for an assignment from a CSV with a header row containing
+    'student_id' or 'username', 'grade' and optionally 'feedback'.
+    Valid rows are applied; the rest are reported back row by row.
+    """
+    http_method_names = ['post']
+    # Skipped rows are kept in the session until the redirect shows them.
+    max_reported_errors = 100
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        form = FileUploadForm(request.POST, request.FILES)
+        if not form.is_valid() or not request.FILES['file'].name.lower().endswith('.csv'):
+            messages.error(request, 'Please upload a CSV file.')
+            return redirect('core:view_submissions', pk=self.object.pk)
+
+        try:
+            rows = list(csv.DictReader(io.StringIO(request.FILES['file'].read().decode('utf-8-sig'))))
+        except (UnicodeDecodeError, csv.Error) as e:
+            messages.error(request, f"Could not read the file: {e}")
+            return redirect('core:view_submissions', pk=self.object.pk)
+
+        rows = [{(k or '').strip().lower(): (v or '').strip() for k, v in row.items()} for row in rows]
+        student_ids = {row['student_id'] for row in rows if row.get('student_id')}
+        usernames = {row['username'] for row in rows if row.get('username') and not row.get('student_id')}
+
+        # Resolve every referenced submission in a single query.
+        submissions = self.object.submissions.filter(
+            models.Q(student__student_id__in=student_ids) | models.Q(student__user__username__in=usernames)
+        ).select_related('student__user', 'assignment')
+        by_student_id = {sub.student.student_id: sub for sub in submissions}
+        by_username = {sub.student.user.username: sub for sub in by_student_id.values()}
+
+        total_marks = self.object.total_marks
+        changed, newly_graded, errors, seen = [], [], [], set()
+        for row_num, row in enumerate(rows, 2): # Row 1 is the header
+            key = row.get('student_id') or row.get('username')
+            sub = by_student_id.get(key) if row.get('student_id') else by_username.get(key)
+            if not key:
+                errors.append(f"Row {row_num}: No student_id or username given.")
+                continue
+            if sub is None:
+                errors.append(f"Row {row_num}: No submission found for '{key}'.")
+                continue
+            if sub.pk in seen:
+                errors.append(f"Row {row_num}: '{key}' appears more than once.")
+                continue
+            try:
+                grade = int(row.get('grade', ''))
+            except ValueError:
+                errors.append(f"Row {row_num}: '{row.get('grade', '')}' is not a whole-number grade.")
+                continue
+            if not 0 <= grade <= total_marks:
+                errors.append(f"Row {row_num}: Grade {grade} is outside 0-{total_marks}.")
+                continue
+
+            seen.add(sub.pk)
+            feedback = row['feedback'] if 'feedback' in row else sub.feedback
+            if grade != sub.grade:
+                newly_graded.append(sub)
+            elif feedback == sub.feedback:
+                continue
+            sub.grade, sub.feedback = grade, feedback
+            changed.append(sub)
+
+        self.save_grades(changed, newly_graded)
+
+        if errors:
+            messages.warning(request, f"Imported {len(changed)} grade(s); {len(errors)} row(s) were skipped.")
+            if len(errors) > self.max_reported_errors:
+                errors = errors[:self.max_reported_errors] + [f"... and {len(errors) - self.max_reported_errors} more."]
+            request.session[self.import_errors_key()] = errors
+            return redirect('core:view_submissions', pk=self.object.pk)
+        messages.success(request, f"Imported {len(changed)} grade(s) and notified {len(newly_graded)} student(s).")
+        return redirect('core:view_submissions', pk=self.object.pk)
+
 class GradeSubmissionView(LoginRequiredMixin, FacultyRequiredMixin, UpdateView):
     model = AssignmentSubmission
     form_class = GradingForm
     
     def get_queryset(self):
         """Security: Ensure faculty can only grade submissions for their own assignments."""
-        return AssignmentSubmission.objects.filter(assignment__subject__faculty=self.request.user.faculty)
+        return AssignmentSubmission.objects.filter(
+            assignment__subject__faculty=self.request.user.faculty
+        ).select_related('assignment', 'student__user')
 
     def get_success_url(self):
         """Redirect back to the submission list page."""
-        submission = self.get_object()
-        return reverse_lazy('core:view_submissions', kwargs={'pk': submission.assignment.pk})
+        return reverse_lazy('core:view_submissions', kwargs={'pk': self.object.assignment_id})
     def form_valid(self, form):
         # NEW: Create notification for the student
-        submission = self.get_object()
-        Notification.objects.create(
-            recipient=submission.student.user,
-            message=f"Your submission for '{submission.assignment.title}' has been graded. You received {form.cleaned_data.get('grade')}."
-        )
+        response = super().form_valid(form)
+        grade_notification(self.object).save()
         messages.success(self.request, "Grade saved and student notified.")
-        return super().form_valid(form)
+        return response
     
 class QuizCreateView(LoginRequiredMixin, FacultyRequiredMixin, CreateView):
     model = Quiz
@@ -950,6 +1461,7 @@ class QuestionCreateView(LoginRequiredMixin, FacultyRequiredMixin, CreateView):
         if option_formset.is_valid():
             option_formset.save()
 
+        # The question_changed signal invalidates the quiz's cached score summary.
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -959,11 +1471,41 @@ class QuizAttemptsListView(LoginRequiredMixin, FacultyRequiredMixin, DetailView)
     model = Quiz
     template_name = 'core/quiz_attempts_list.html'
     context_object_name = 'quiz'
+    paginate_by = 50
+    # Maps the ?sort= values accepted from the table headers to ORM orderings.
+    sort_fields = {
+        'student': ('student__user__last_name', 'student__user__first_name', 'pk'),
+        'score': ('score', 'pk'),
+        'completed': ('completed_at', 'pk'),
+    }
+    default_sort = 'student'
 
     def get_queryset(self):
         """Security: Faculty can only view attempts for quizzes in their subjects."""
         return Quiz.objects.filter(subject__faculty=self.request.user.faculty)
 
+    def get_sort(self):
+        sort = self.request.GET.get('sort', self.default_sort)
+        if sort.lstrip('-') not in self.sort_fields:
+            sort = self.default_sort
+        return sort
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        sort = self.get_sort()
+        ordering = self.sort_fields[sort.lstrip('-')]
+        if sort.startswith('-'):
+            ordering = ['-' + field for field in ordering]
+
+        attempts = self.object.attempts.select_related('student__user').order_by(*ordering)
+        page = Paginator(attempts, self.paginate_by).get_page(self.request.GET.get('page'))
+
+        context['page_obj'] = page
+        context['attempts'] = page.object_list
+        context['sort'] = sort
+        context['summary'] = quiz_score_summary(self.object)
+        return context
+
 # core/views.py
 
 class GradeQuizAttemptView(LoginRequiredMixin, FacultyRequiredMixin, View):
@@ -974,20 +1516,10 @@ class GradeQuizAttemptView(LoginRequiredMixin, FacultyRequiredMixin, View):
         descriptive_answers_qs = attempt.answers.filter(question__question_type='DESCRIPTIVE')
         formset = DescriptiveAnswerFormSet(queryset=descriptive_answers_qs)
 
-        # --- NEW LOGIC HERE ---
-        # Pair up questions with their answers for easier rendering in the template
-        questions_and_answers = []
-        for question in attempt.quiz.questions.all().order_by('id'):
-            student_answer = attempt.answers.filter(question=question).first()
-            questions_and_answers.append({
-                'question': question,
-                'answer': student_answer
-            })
-        
         context = {
             'attempt': attempt,
             'formset': formset,
-            'questions_and_answers': questions_and_answers,
+            'questions_and_answers': self.get_questions_and_answers(attempt),
         }
         return render(request, 'core/grade_quiz_attempt.html', context)
 
@@ -1001,9 +1533,7 @@ class GradeQuizAttemptView(LoginRequiredMixin, FacultyRequiredMixin, View):
         if formset.is_valid():
             formset.save()
             
-            total_score = attempt.answers.filter(mcq_option__is_correct=True).aggregate(
-                total=models.Sum('question__marks')
-            )['total'] or 0
+            total_score = attempt.get_mcq_score()
             
             # Use the saved formset instances to calculate the sum
             descriptive_score = 0
@@ -1013,24 +1543,172 @@ class GradeQuizAttemptView(LoginRequiredMixin, FacultyRequiredMixin, View):
 
             attempt.score = total_score + descriptive_score
             attempt.save()
+            invalidate_quiz_score_summary(attempt.quiz_id)
             messages.success(request, f"Successfully graded quiz for {attempt.student.user.get_full_name()}.")
             return redirect('core:quiz_attempts_list', pk=attempt.quiz.pk)
         
         # We need to rebuild the context if the form is invalid
-        questions_and_answers = []
-        for question in attempt.quiz.questions.all().order_by('id'):
-            student_answer = attempt.answers.filter(question=question).first()
-            questions_and_answers.append({
-                'question': question,
-                'answer': student_answer
-            })
         context = {
             'attempt': attempt, 
             'formset': formset,
-            'questions_and_answers': questions_and_answers
+            'questions_and_answers': self.get_questions_and_answers(attempt)
         }
         return render(request, 'core/grade_quiz_attempt.html', context)
 
+    def get_questions_and_answers(self, attempt):
+        """Pair up questions with their answers for easier rendering in the template."""
+        answers = {answer.question_id: answer for answer in attempt.get_answers()}
+        return [
+            {'question': question, 'answer': answers.get(question.pk)}
+            for question in attempt.quiz.questions.all().order_by('id')
+        ]
+
+class ChunkedUploadInitView(LoginRequiredMixin, View):
+    """Start a resumable upload. POST: filename, size and an optional sha256 of the whole file."""
+
+    def post(self, request, *args, **kwargs):
+        filename = os.path.basename(request.POST.get('filename', '').strip())
+        try:
+            size = int(request.POST.get('size', ''))
+        except ValueError:
+            size = 0
+        if not filename or not 0 < size <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+            return JsonResponse({'error': 'A filename and a valid size are required.'}, status=400)
+
+        upload = ChunkedUpload.objects.create(
+            user=request.user,
+            filename=filename,
+            size=size,
+            sha256=request.POST.get('sha256', '').strip(),
+        )
+        return JsonResponse(self.describe(upload), status=201)
+
+    @staticmethod
+    def describe(upload):
+        return {
+            'upload_id': str(upload.upload_id),
+            'offset': upload.offset,
+            'size': upload.size,
+            'chunk_size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        }
+
+class ChunkedUploadChunkView(LoginRequiredMixin, View):
+    """
+    GET reports how many bytes have been received so a client can resume.
+    PUT appends the request body at the 'Upload-Offset' header's position,
+    optionally verified against an 'Upload-Checksum' (sha256 hex) header.
+    """
+
+    def get_upload(self):
+        return get_object_or_404(ChunkedUpload, upload_id=self.kwargs['upload_id'], user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(ChunkedUploadInitView.describe(self.get_upload()))
+
+    def put(self, request, *args, **kwargs):
+        upload = self.get_upload()
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
+            return JsonResponse({'error': 'Upload-Offset and Content-Length headers are required.'}, status=400)
+        try:
+            # Read the body as a stream so chunks never have to fit in memory.
+            append_chunk(upload, request, offset, length, request.headers.get('Upload-Checksum', ''))
+        except ChunkedUploadError as e:
+            return JsonResponse({'error': str(e), 'offset': upload.offset}, status=e.status)
+        return JsonResponse(ChunkedUploadInitView.describe(upload))
+
+class ChunkedUploadFinalizeView(LoginRequiredMixin, View):
+    """
+    Verify a completed upload and attach it. POST 'target' is either
+    'submission' (with 'assignment') for students or 'resource' (with
+    'subject' plus the resource form fields) for faculty.
+    """
+    ResourceForm = forms.modelform_factory(LearningResource, fields=['title', 'description', 'link'])
+
+    def post(self, request, *args, **kwargs):
+        upload = get_object_or_404(ChunkedUpload, upload_id=self.kwargs['upload_id'], user=request.user)
+        target = request.POST.get('target')
+        try:
+            if target == 'submission' and hasattr(request.user, 'student'):
+                instance, field, redirect_url = self.build_submission(request)
+            elif target == 'resource' and hasattr(request.user, 'faculty'):
+                instance, field, redirect_url = self.build_resource(request)
+            else:
+                raise ChunkedUploadError('Unknown upload target.')
+            verified = finish_upload(upload)
+        except ChunkedUploadError as e:
+            return JsonResponse({'error': str(e)}, status=e.status)
+
+        try:
+            with verified, transaction.atomic():
+                getattr(instance, field).save(upload.filename, verified, save=True)
+                upload.delete()
+        except IntegrityError:
+            # Another request submitted the assignment after build_submission() checked.
+            getattr(instance, field).delete(save=False)
+            return JsonResponse({'error': 'You have already submitted this assignment.'}, status=409)
+        return JsonResponse({'redirect': redirect_url})
+
+    def build_submission(self, request):
+        student = request.user.student
+        assignment = get_object_or_404(
+            Assignment, pk=request.POST.get('assignment'), subject__course__students=student
+        )
+        if AssignmentSubmission.objects.filter(assignment=assignment, student=student).exists():
+            raise ChunkedUploadError('You have already submitted this assignment.', status=409)
+        submission = AssignmentSubmission(assignment=assignment, student=student)
+        return submission, 'submitted_file', reverse('core:student_assignment_detail', kwargs={'pk': assignment.pk})
+
+    def build_resource(self, request):
+        subject = get_object_or_404(request.user.faculty.subjects_taught, pk=request.POST.get('subject'))
+        form = self.ResourceForm(request.POST)
+        if not form.is_valid():
+            raise ChunkedUploadError(' '.join(f'{field}: {" ".join(errors)}' for field, errors in form.errors.items()))
+        form.instance.subject = subject
+        return form.instance, 'file', reverse('core:faculty_subject_detail', kwargs={'pk': subject.pk})
+
+class ProtectedFileView(LoginRequiredMixin, View):
+    """Base for views that serve an uploaded file only to users who may see it."""
+    model = None
+    file_field = None
+    as_attachment = False
+
+    def get_access_filter(self, user):
+        raise NotImplementedError
+
+    def get(self, request, pk):
+        queryset = self.model.objects.filter(self.get_access_filter(request.user)).distinct()
+        fieldfile = getattr(get_object_or_404(queryset, pk=pk), self.file_field)
+        if not fieldfile:
+            raise Http404("No file has been uploaded.")
+        try:
+            return serve_file(request, fieldfile, as_attachment=self.as_attachment)
+        except FileNotFoundError:
+            raise Http404("The file is missing from storage.")
+
+class ResourceFileView(ProtectedFileView):
+    """Students enrolled in the course, its teaching faculty and the HOD may download a resource."""
+    model = LearningResource
+    file_field = 'file'
+
+    def get_access_filter(self, user):
+        return (
+            models.Q(subject__course__students__user=user)
+            | models.Q(subject__faculty__user=user)
+            | models.Q(subject__course__department__hod__user=user)
+        )
+
+class SubmissionFileView(ProtectedFileView):
+    """A submission is visible to the student who made it and the faculty teaching the subject."""
+    model = AssignmentSubmission
+    file_field = 'submitted_file'
+    as_attachment = True
+
+    def get_access_filter(self, user):
+        return models.Q(student__user=user) | models.Q(assignment__subject__faculty__user=user)
+
 class NotificationListView(LoginRequiredMixin, ListView):
     model = Notification
     template_name = 'core/notification_list.html'